@@ -11,7 +11,9 @@ Demonstrates:
 - Subquery patterns
 """
 
-from datetime import datetime, timedelta
+import functools
+import re
+from array import array
 from google.protobuf.struct_pb2 import Value
 from geniustechspace.query.api.v1 import (
     query_pb2,
@@ -22,100 +24,217 @@ from geniustechspace.query.api.v1 import (
     relation_pb2,
     pagination_pb2
 )
+from dsl import iso_ago, pack_float32
+from filter_utils import CONST_FALSE, CONST_TRUE, fold_or_eq, push_not, simplify
+from protobuf_backend import warn_if_pure_python
+
+
+warn_if_pure_python()
+
+
+_HOUR = 3600
+_DAY = 24 * _HOUR
+
+
+# RE2 patterns used by example 10, checked once by _validate_regexes()
+_EMAIL_PATTERN = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+_US_PHONE_PATTERN = r"^\+1-\d{3}-\d{3}-\d{4}$"
+_DOCUMENT_ID_PATTERN = r"^DOC-\d{6}-[A-Z]{3}$"
+
+
+def _validate_regexes():
+    """
+    Fail at import, not per call, if a pattern constant does not compile
+    
+    Checked with Python's re, which only approximates RE2: it catches
+    malformed patterns but also accepts constructs RE2 rejects, such as
+    lookarounds and backreferences. Keep the patterns to the common subset.
+    """
+    for pattern in (_EMAIL_PATTERN, _US_PHONE_PATTERN, _DOCUMENT_ID_PATTERN):
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern {pattern!r}: {e}") from e
+
+
+_validate_regexes()
+
+
+# Opt-in: set only for services known to support int8 vectors. The
+# full-precision embedding is always sent too, as one packed buffer, since
+# a service without int8 support falls back to it.
+_QUANTIZE_EMBEDDINGS = False
+
+
+# Interned literal values. Condition copies a Value on assignment, so one
+# shared instance per literal is safe to reuse across every example.
+_V_STR = {s: Value(string_value=s) for s in (
+    "active", "admin", "owner", "trial", "vip", "low", "completed", "shipped",
+    "page_view", "@ACME.COM", "john", "tech",
+    _EMAIL_PATTERN, _US_PHONE_PATTERN, _DOCUMENT_ID_PATTERN
+)}
+_V_NUM = {n: Value(number_value=n) for n in (0, 5.0, 10, 100, 10000)}
+_V_BOOL = {b: Value(bool_value=b) for b in (True, False)}
+
+
+def _quantize_int8(vector) -> tuple:
+    """
+    Symmetric int8 quantization of an embedding vector
+    
+    Returns (packed signed bytes, scale) where component i is recovered as
+    byte[i] * scale. Stdlib only; scale is max(|component|) / 127.
+    """
+    scale = max(map(abs, vector)) / 127.0 or 1.0
+    return array("b", (round(x / scale) for x in vector)).tobytes(), scale
+
+
+# Simulated 384-dim embedding for example 6, held as one float32 buffer and
+# encoded once at import instead of as a list of Python floats per build.
+_DEMO_EMBEDDING = array("f", [0.123]) * 384
+_DEMO_EMBEDDING_I8, _DEMO_EMBEDDING_SCALE = _quantize_int8(_DEMO_EMBEDDING)
+_DEMO_EMBEDDING_RAW = pack_float32(_DEMO_EMBEDDING)
+
+
+def _cond(field: str, operator: int, value: Value = None, values=(),
+          case_sensitive: bool = False) -> filter_pb2.Filter:
+    """
+    Build a leaf condition filter by field assignment
+    
+    Skips the keyword-argument constructor path; literal values are
+    copied in from the interned tables above.
+    """
+    node = filter_pb2.Filter()
+    _set_cond(node, field, operator, value, values, case_sensitive)
+    return node
+
+
+def _set_cond(node: filter_pb2.Filter, field: str, operator: int,
+              value: Value = None, values=(), case_sensitive: bool = False) -> filter_pb2.Condition:
+    """Fill in a leaf condition on an existing filter node (e.g. from .add())"""
+    cond = node.condition
+    cond.field = field
+    cond.operator = operator
+    if value is not None:
+        cond.value.CopyFrom(value)
+    if values:
+        cond.values.extend(values)
+    if case_sensitive:
+        cond.case_sensitive = True
+    return cond
+
+
+# Template cache
+#
+# Query shapes below are static; building them means dozens of nested
+# constructor calls. Each template is built once, normalized, kept as
+# wire-format bytes and handed out as a fresh message per call, so callers
+# may mutate the result freely.
+
+@functools.lru_cache(maxsize=None)
+def _template_bytes(builder) -> bytes:
+    """Build and normalize a query template once; cache its serialized form"""
+    query = builder()
+    if query.HasField("filter"):
+        node = simplify(fold_or_eq(query.filter))
+        if node is CONST_TRUE:
+            query.ClearField("filter")
+        elif node is not CONST_FALSE:  # Kept as-is; main() skips it
+            query.filter.CopyFrom(node)
+    return query.SerializeToString()
+
+
+def _from_template(builder) -> query_pb2.Query:
+    """Return a fresh copy of a cached query template"""
+    return query_pb2.Query.FromString(_template_bytes(builder))
+
+
+# Timestamp templates
+#
+# Examples 1, 4, 7 and 8 differ between calls only by a time cutoff. Their
+# templates carry one comparison condition without a value (the
+# placeholder); its location in the normalized filter is found once, so
+# each call is a template copy plus one string assignment.
+
+def _find_placeholder(node: filter_pb2.Filter, path: tuple = ()):
+    """Path of (oneof, index) steps to the first valueless comparison leaf"""
+    kind = node.WhichOneof("filter_type")
+    if kind == "not_":
+        return _find_placeholder(node.not_.condition, path + ((kind, None),))
+    if kind in ("and_", "or_"):
+        for index, child in enumerate(getattr(node, kind).conditions):
+            found = _find_placeholder(child, path + ((kind, index),))
+            if found is not None:
+                return found
+        return None
+    cond = node.condition
+    if (cond.operator in (filter_pb2.OPERATOR_LT, filter_pb2.OPERATOR_LTE,
+                          filter_pb2.OPERATOR_GT, filter_pb2.OPERATOR_GTE)
+            and not cond.HasField("value")):
+        return path
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _placeholder_path(builder) -> tuple:
+    """Locate the timestamp placeholder of a template once"""
+    path = _find_placeholder(_from_template(builder).filter)
+    if path is None:
+        raise ValueError(f"{builder.__name__} has no timestamp placeholder")
+    return path
+
+
+def _from_timestamp_template(builder, seconds_ago: int) -> query_pb2.Query:
+    """Return a fresh copy of a template with its cutoff set to now - seconds_ago"""
+    query = _from_template(builder)
+    node = query.filter
+    for kind, index in _placeholder_path(builder):
+        node = node.not_.condition if index is None else getattr(node, kind).conditions[index]
+    node.condition.value.string_value = iso_ago(seconds_ago)
+    return query
+
+
+def _build_example_1() -> query_pb2.Query:
+    """Template for example 1; created_at cutoff is filled in per call"""
+    # Built in place: every node is created inside its parent by .add() or
+    # field access, with no temporary sub-messages to copy in.
+    query = query_pb2.Query()
+    query.entity = "users"
+    branches = query.filter.or_.conditions
+    
+    # Branch 1: Active admins/owners
+    active_admins = branches.add().and_.conditions
+    _set_cond(active_admins.add(), "status", filter_pb2.OPERATOR_EQ, _V_STR["active"])
+    _set_cond(active_admins.add(), "role", filter_pb2.OPERATOR_IN,
+              values=(_V_STR["admin"], _V_STR["owner"]))
+    
+    # Branch 2: Recent VIP trials
+    vip_trials = branches.add().and_.conditions
+    _set_cond(vip_trials.add(), "status", filter_pb2.OPERATOR_EQ, _V_STR["trial"])
+    _set_cond(vip_trials.add(), "created_at", filter_pb2.OPERATOR_GTE)  # Cutoff set per call
+    _set_cond(vip_trials.add(), "tags", filter_pb2.OPERATOR_ARRAY_CONTAINS, _V_STR["vip"])
+    
+    query.pagination.page_size = 100
+    # Advisory: branch 1 is a single range scan on (status, role)
+    query.options.index_hints.append("idx_status_role")
+    return query
 
 
 def example_1_complex_boolean_logic():
     """
     Find users who match complex criteria:
-    (status='active' AND (role='admin' OR role='owner'))
+    (status='active' AND role IN ('admin', 'owner'))
     OR (status='trial' AND created_at > 30 days ago AND tags contains 'vip')
     """
-    thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).isoformat() + "Z"
-    
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            or_=filter_pb2.OrFilter(
-                conditions=[
-                    # Branch 1: Active admins/owners
-                    filter_pb2.Filter(
-                        and_=filter_pb2.AndFilter(
-                            conditions=[
-                                filter_pb2.Filter(
-                                    condition=filter_pb2.Condition(
-                                        field="status",
-                                        operator=filter_pb2.OPERATOR_EQ,
-                                        value=Value(string_value="active")
-                                    )
-                                ),
-                                filter_pb2.Filter(
-                                    or_=filter_pb2.OrFilter(
-                                        conditions=[
-                                            filter_pb2.Filter(
-                                                condition=filter_pb2.Condition(
-                                                    field="role",
-                                                    operator=filter_pb2.OPERATOR_EQ,
-                                                    value=Value(string_value="admin")
-                                                )
-                                            ),
-                                            filter_pb2.Filter(
-                                                condition=filter_pb2.Condition(
-                                                    field="role",
-                                                    operator=filter_pb2.OPERATOR_EQ,
-                                                    value=Value(string_value="owner")
-                                                )
-                                            )
-                                        ]
-                                    )
-                                )
-                            ]
-                        )
-                    ),
-                    # Branch 2: Recent VIP trials
-                    filter_pb2.Filter(
-                        and_=filter_pb2.AndFilter(
-                            conditions=[
-                                filter_pb2.Filter(
-                                    condition=filter_pb2.Condition(
-                                        field="status",
-                                        operator=filter_pb2.OPERATOR_EQ,
-                                        value=Value(string_value="trial")
-                                    )
-                                ),
-                                filter_pb2.Filter(
-                                    condition=filter_pb2.Condition(
-                                        field="created_at",
-                                        operator=filter_pb2.OPERATOR_GTE,
-                                        value=Value(string_value=thirty_days_ago)
-                                    )
-                                ),
-                                filter_pb2.Filter(
-                                    condition=filter_pb2.Condition(
-                                        field="tags",
-                                        operator=filter_pb2.OPERATOR_ARRAY_CONTAINS,
-                                        value=Value(string_value="vip")
-                                    )
-                                )
-                            ]
-                        )
-                    )
-                ]
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=100)
-    )
+    query = _from_timestamp_template(_build_example_1, 30 * _DAY)
     
     print("Example 1: Complex boolean logic")
     print("Logic: (active admins/owners) OR (recent VIP trials)")
-    print("Nesting: 3 levels deep\n")
+    print("Nesting: 2 levels deep\n")
     return query
 
 
-def example_2_negation_filter():
-    """
-    Find products NOT matching certain criteria:
-    NOT (discontinued OR out_of_stock OR (price < 10 AND quality = 'low'))
-    """
+def _build_example_2() -> query_pb2.Query:
+    """Template for example 2; NOT is pushed down to the leaves"""
     query = query_pb2.Query(
         entity="products",
         filter=filter_pb2.Filter(
@@ -124,39 +243,15 @@ def example_2_negation_filter():
                     or_=filter_pb2.OrFilter(
                         conditions=[
                             # Discontinued
-                            filter_pb2.Filter(
-                                condition=filter_pb2.Condition(
-                                    field="discontinued",
-                                    operator=filter_pb2.OPERATOR_EQ,
-                                    value=Value(bool_value=True)
-                                )
-                            ),
+                            _cond("discontinued", filter_pb2.OPERATOR_EQ, _V_BOOL[True]),
                             # Out of stock
-                            filter_pb2.Filter(
-                                condition=filter_pb2.Condition(
-                                    field="stock_quantity",
-                                    operator=filter_pb2.OPERATOR_EQ,
-                                    value=Value(number_value=0)
-                                )
-                            ),
+                            _cond("stock_quantity", filter_pb2.OPERATOR_EQ, _V_NUM[0]),
                             # Cheap and low quality
                             filter_pb2.Filter(
                                 and_=filter_pb2.AndFilter(
                                     conditions=[
-                                        filter_pb2.Filter(
-                                            condition=filter_pb2.Condition(
-                                                field="price",
-                                                operator=filter_pb2.OPERATOR_LT,
-                                                value=Value(number_value=10)
-                                            )
-                                        ),
-                                        filter_pb2.Filter(
-                                            condition=filter_pb2.Condition(
-                                                field="quality",
-                                                operator=filter_pb2.OPERATOR_EQ,
-                                                value=Value(string_value="low")
-                                            )
-                                        )
+                                        _cond("price", filter_pb2.OPERATOR_LT, _V_NUM[10]),
+                                        _cond("quality", filter_pb2.OPERATOR_EQ, _V_STR["low"])
                                     ]
                                 )
                             )
@@ -167,28 +262,33 @@ def example_2_negation_filter():
         ),
         pagination=pagination_pb2.Pagination(page_size=100)
     )
+    query.filter.CopyFrom(push_not(query.filter))
+    return query
+
+
+def example_2_negation_filter():
+    """
+    Find products NOT matching certain criteria:
+    NOT (discontinued OR out_of_stock OR (price < 10 AND quality = 'low'))
+    
+    Sent as the equivalent De Morgan form, so no NOT wraps the OR:
+    discontinued != true AND stock_quantity != 0
+    AND (price >= 10 OR quality != 'low')
+    """
+    query = _from_template(_build_example_2)
     
     print("Example 2: Negation filter")
     print("Logic: NOT (discontinued OR out_of_stock OR cheap_low_quality)")
+    print("Sent as: NOT discontinued AND in_stock AND NOT cheap_low_quality")
     print("Result: High-quality available products\n")
     return query
 
 
-def example_3_multi_level_aggregation():
-    """
-    Sales report with multiple aggregations and HAVING clause:
-    Group by category, subcategory
-    Show categories with >$10k revenue
-    """
-    query = query_pb2.Query(
+def _build_example_3() -> query_pb2.Query:
+    """Template for example 3"""
+    return query_pb2.Query(
         entity="sales",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="status",
-                operator=filter_pb2.OPERATOR_EQ,
-                value=Value(string_value="completed")
-            )
-        ),
+        filter=_cond("status", filter_pb2.OPERATOR_EQ, _V_STR["completed"]),
         aggregation=aggregation_pb2.Aggregation(
             group_by=["category", "subcategory"],
             aggregates=[
@@ -226,21 +326,9 @@ def example_3_multi_level_aggregation():
                 and_=filter_pb2.AndFilter(
                     conditions=[
                         # Revenue > $10k
-                        filter_pb2.Filter(
-                            condition=filter_pb2.Condition(
-                                field="total_revenue",
-                                operator=filter_pb2.OPERATOR_GTE,
-                                value=Value(number_value=10000)
-                            )
-                        ),
+                        _cond("total_revenue", filter_pb2.OPERATOR_GTE, _V_NUM[10000]),
                         # At least 100 transactions
-                        filter_pb2.Filter(
-                            condition=filter_pb2.Condition(
-                                field="transaction_count",
-                                operator=filter_pb2.OPERATOR_GTE,
-                                value=Value(number_value=100)
-                            )
-                        )
+                        _cond("transaction_count", filter_pb2.OPERATOR_GTE, _V_NUM[100])
                     ]
                 )
             )
@@ -250,8 +338,20 @@ def example_3_multi_level_aggregation():
                 field="total_revenue",
                 direction=sort_pb2.SORT_DIRECTION_DESC
             )
-        ]
+        ],
+        options=query_pb2.QueryOptions(
+            index_hints=["idx_category_subcategory"]  # Stream groups from the (category, subcategory) index
+        )
     )
+
+
+def example_3_multi_level_aggregation():
+    """
+    Sales report with multiple aggregations and HAVING clause:
+    Group by category, subcategory
+    Show categories with >$10k revenue
+    """
+    query = _from_template(_build_example_3)
     
     print("Example 3: Multi-level aggregation with HAVING")
     print("Group by: category, subcategory")
@@ -260,17 +360,11 @@ def example_3_multi_level_aggregation():
     return query
 
 
-def example_4_percentile_aggregation():
-    """Calculate response time percentiles for API endpoints"""
-    query = query_pb2.Query(
+def _build_example_4() -> query_pb2.Query:
+    """Template for example 4; timestamp cutoff is filled in per call"""
+    return query_pb2.Query(
         entity="api_logs",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="timestamp",
-                operator=filter_pb2.OPERATOR_GTE,
-                value=Value(string_value=(datetime.utcnow() - timedelta(hours=1)).isoformat() + "Z")
-            )
-        ),
+        filter=_cond("timestamp", filter_pb2.OPERATOR_GTE),  # Cutoff set per call
         aggregation=aggregation_pb2.Aggregation(
             group_by=["endpoint", "method"],
             aggregates=[
@@ -281,19 +375,22 @@ def example_4_percentile_aggregation():
                 aggregation_pb2.Aggregate(
                     function=aggregation_pb2.AGGREGATE_FUNCTION_PERCENTILE,
                     field="response_time_ms",
-                    percentile=50.0,
+                    percentile=0.50,
+                    error_tolerance=0.01,  # t-digest is fine for SLA reporting
                     alias="p50"
                 ),
                 aggregation_pb2.Aggregate(
                     function=aggregation_pb2.AGGREGATE_FUNCTION_PERCENTILE,
                     field="response_time_ms",
-                    percentile=95.0,
+                    percentile=0.95,
+                    error_tolerance=0.01,
                     alias="p95"
                 ),
                 aggregation_pb2.Aggregate(
                     function=aggregation_pb2.AGGREGATE_FUNCTION_PERCENTILE,
                     field="response_time_ms",
-                    percentile=99.0,
+                    percentile=0.99,
+                    error_tolerance=0.01,
                     alias="p99"
                 ),
                 aggregation_pb2.Aggregate(
@@ -308,71 +405,55 @@ def example_4_percentile_aggregation():
                 field="p99",
                 direction=sort_pb2.SORT_DIRECTION_DESC
             )
-        ]
+        ],
+        pagination=pagination_pb2.Pagination(page_size=20),  # Top 20 slowest only
+        options=query_pb2.QueryOptions(
+            index_hints=["idx_endpoint_method"]  # Stream groups from the (endpoint, method) index
+        )
     )
+
+
+def example_4_percentile_aggregation():
+    """Calculate response time percentiles for API endpoints"""
+    query = _from_timestamp_template(_build_example_4, _HOUR)
     
     print("Example 4: Percentile aggregation (SLA monitoring)")
     print("Timeframe: Last 1 hour")
-    print("Metrics: p50, p95, p99, max latency\n")
+    print("Metrics: p50, p95, p99 (±1%), max latency")
+    print("Limit: 20 slowest endpoints\n")
     return query
 
 
-def example_5_explicit_join():
-    """
-    Join orders with customers and products:
-    Orders INNER JOIN Customers ON customer_id
-         LEFT JOIN Products ON product_id
-    """
-    query = query_pb2.Query(
+def _build_example_5() -> query_pb2.Query:
+    """Template for example 5"""
+    return query_pb2.Query(
         entity="orders",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="status",
-                operator=filter_pb2.OPERATOR_IN,
-                values=[
-                    Value(string_value="completed"),
-                    Value(string_value="shipped")
-                ]
-            )
-        ),
+        filter=_cond("status", filter_pb2.OPERATOR_IN, values=(_V_STR["completed"], _V_STR["shipped"])),
         relation=[
             # INNER JOIN customers
             relation_pb2.Relation(
                 entity="customers",
                 alias="customer",
                 type=relation_pb2.JOIN_TYPE_INNER,
-                on=filter_pb2.Filter(
-                    condition=filter_pb2.Condition(
-                        field="customer_id",
-                        operator=filter_pb2.OPERATOR_EQ,
-                        value=Value(string_value="customer.id")  # Field reference
-                    )
-                ),
-                eager=True
+                on="orders.customer_id = customer.id",
+                eager=True,
+                project=["name", "email"]  # Only columns the join must materialize
             ),
             # LEFT JOIN products
             relation_pb2.Relation(
                 entity="products",
                 alias="product",
                 type=relation_pb2.JOIN_TYPE_LEFT_OUTER,
-                on=filter_pb2.Filter(
-                    condition=filter_pb2.Condition(
-                        field="product_id",
-                        operator=filter_pb2.OPERATOR_EQ,
-                        value=Value(string_value="product.id")
-                    )
-                ),
-                eager=True
+                on="orders.product_id = product.id",
+                eager=True,
+                project=["name", "price"]
             )
         ],
         projection=query_pb2.Projection(
             include=[
                 "order_id",
-                "total_amount",
-                "customer.name",
-                "customer.email",
-                "product.name",
-                "product.price"
+                "total_amount"
+                # customer.* and product.* come from the relation projections
             ]
         ),
         sort=[
@@ -383,40 +464,31 @@ def example_5_explicit_join():
         ],
         pagination=pagination_pb2.Pagination(page_size=50)
     )
+
+
+def example_5_explicit_join():
+    """
+    Join orders with customers and products:
+    Orders INNER JOIN Customers ON customer_id
+         LEFT JOIN Products ON product_id
+    """
+    query = _from_template(_build_example_5)
     
     print("Example 5: Explicit joins")
     print("Joins: orders → customers (INNER), orders → products (LEFT)")
-    print("Projection: Denormalized result\n")
+    print("Projection: Pushed into each join (4 related columns)\n")
     return query
 
 
-def example_6_hybrid_search():
-    """
-    Hybrid search combining full-text and semantic:
-    Match "wireless headphones" in text OR similar by embedding
-    """
-    # Simulated embedding vector (384 dimensions)
-    query_embedding = [0.123] * 384
-    
+def _build_example_6() -> query_pb2.Query:
+    """Template for example 6"""
     query = query_pb2.Query(
         entity="products",
         filter=filter_pb2.Filter(
             and_=filter_pb2.AndFilter(
                 conditions=[
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="active")
-                        )
-                    ),
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="stock_quantity",
-                            operator=filter_pb2.OPERATOR_GT,
-                            value=Value(number_value=0)
-                        )
-                    )
+                    _cond("status", filter_pb2.OPERATOR_EQ, _V_STR["active"]),
+                    _cond("stock_quantity", filter_pb2.OPERATOR_GT, _V_NUM[0])
                 ]
             )
         ),
@@ -425,7 +497,6 @@ def example_6_hybrid_search():
             type=search_pb2.SEARCH_TYPE_HYBRID,
             fields=["name", "description", "tags"],
             vector_field="description_embedding",
-            embedding=query_embedding,
             min_score=0.5,
             boost={
                 "name": 2.0,  # Boost title matches
@@ -435,40 +506,37 @@ def example_6_hybrid_search():
         ),
         pagination=pagination_pb2.Pagination(page_size=20)
     )
+    query.search.embedding_raw = _DEMO_EMBEDDING_RAW
+    if _QUANTIZE_EMBEDDINGS:
+        # Preferred by services with int8 dot-product kernels
+        query.search.embedding_i8 = _DEMO_EMBEDDING_I8
+        query.search.embedding_scale = _DEMO_EMBEDDING_SCALE
+    return query
+
+
+def example_6_hybrid_search():
+    """
+    Hybrid search combining full-text and semantic:
+    Match "wireless headphones" in text OR similar by embedding
+    """
+    query = _from_template(_build_example_6)
     
     print("Example 6: Hybrid search")
     print("Text: 'wireless headphones'")
-    print("Vector: 384-dim embedding")
+    print(f"Vector: 384-dim embedding{' (+ int8-quantized)' if _QUANTIZE_EMBEDDINGS else ''}")
     print("Combines: Full-text + semantic similarity\n")
     return query
 
 
-def example_7_time_series_bucketing():
-    """
-    Time-series analysis with hourly buckets:
-    Simulate time bucketing using aggregation
-    """
-    seven_days_ago = (datetime.utcnow() - timedelta(days=7)).isoformat() + "Z"
-    
-    query = query_pb2.Query(
+def _build_example_7() -> query_pb2.Query:
+    """Template for example 7; timestamp cutoff is filled in per call"""
+    return query_pb2.Query(
         entity="events",
         filter=filter_pb2.Filter(
             and_=filter_pb2.AndFilter(
                 conditions=[
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="timestamp",
-                            operator=filter_pb2.OPERATOR_GTE,
-                            value=Value(string_value=seven_days_ago)
-                        )
-                    ),
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="event_type",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="page_view")
-                        )
-                    )
+                    _cond("timestamp", filter_pb2.OPERATOR_GTE),  # Cutoff set per call
+                    _cond("event_type", filter_pb2.OPERATOR_EQ, _V_STR["page_view"])
                 ]
             )
         ),
@@ -493,6 +561,14 @@ def example_7_time_series_bucketing():
             )
         ]
     )
+
+
+def example_7_time_series_bucketing():
+    """
+    Time-series analysis with hourly buckets:
+    Simulate time bucketing using aggregation
+    """
+    query = _from_timestamp_template(_build_example_7, 7 * _DAY)
     
     print("Example 7: Time-series bucketing")
     print("Timeframe: Last 7 days")
@@ -501,17 +577,11 @@ def example_7_time_series_bucketing():
     return query
 
 
-def example_8_variance_stddev():
-    """Statistical analysis with variance and standard deviation"""
-    query = query_pb2.Query(
+def _build_example_8() -> query_pb2.Query:
+    """Template for example 8; timestamp cutoff is filled in per call"""
+    return query_pb2.Query(
         entity="sensor_readings",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="timestamp",
-                operator=filter_pb2.OPERATOR_GTE,
-                value=Value(string_value=(datetime.utcnow() - timedelta(hours=24)).isoformat() + "Z")
-            )
-        ),
+        filter=_cond("timestamp", filter_pb2.OPERATOR_GTE),  # Cutoff set per call
         aggregation=aggregation_pb2.Aggregation(
             group_by=["sensor_id", "location"],
             aggregates=[
@@ -545,13 +615,7 @@ def example_8_variance_stddev():
                     alias="max_temp"
                 )
             ],
-            having=filter_pb2.Filter(
-                condition=filter_pb2.Condition(
-                    field="temp_stddev",
-                    operator=filter_pb2.OPERATOR_GT,
-                    value=Value(number_value=5.0)  # High variability
-                )
-            )
+            having=_cond("temp_stddev", filter_pb2.OPERATOR_GT, _V_NUM[5.0]),  # High variability
         ),
         sort=[
             sort_pb2.Sort(
@@ -560,6 +624,11 @@ def example_8_variance_stddev():
             )
         ]
     )
+
+
+def example_8_variance_stddev():
+    """Statistical analysis with variance and standard deviation"""
+    query = _from_timestamp_template(_build_example_8, 24 * _HOUR)
     
     print("Example 8: Statistical analysis")
     print("Metrics: Avg, StdDev, Variance, Min, Max")
@@ -567,45 +636,29 @@ def example_8_variance_stddev():
     return query
 
 
-def example_9_case_insensitive_search():
-    """Case-insensitive pattern matching across multiple fields"""
-    query = query_pb2.Query(
+def _build_example_9() -> query_pb2.Query:
+    """Template for example 9"""
+    return query_pb2.Query(
         entity="users",
         filter=filter_pb2.Filter(
             or_=filter_pb2.OrFilter(
                 conditions=[
                     # Email contains domain (case-insensitive)
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="email",
-                            operator=filter_pb2.OPERATOR_CONTAINS,
-                            value=Value(string_value="@ACME.COM"),
-                            case_sensitive=False
-                        )
-                    ),
+                    _cond("email", filter_pb2.OPERATOR_CONTAINS, _V_STR["@ACME.COM"], case_sensitive=False),
                     # Name starts with prefix (case-insensitive)
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="profile.name",
-                            operator=filter_pb2.OPERATOR_STARTS_WITH,
-                            value=Value(string_value="john"),
-                            case_sensitive=False
-                        )
-                    ),
+                    _cond("profile.name", filter_pb2.OPERATOR_STARTS_WITH, _V_STR["john"], case_sensitive=False),
                     # Company contains keyword (case-insensitive)
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="company.name",
-                            operator=filter_pb2.OPERATOR_CONTAINS,
-                            value=Value(string_value="tech"),
-                            case_sensitive=False
-                        )
-                    )
+                    _cond("company.name", filter_pb2.OPERATOR_CONTAINS, _V_STR["tech"], case_sensitive=False)
                 ]
             )
         ),
         pagination=pagination_pb2.Pagination(page_size=100)
     )
+
+
+def example_9_case_insensitive_search():
+    """Case-insensitive pattern matching across multiple fields"""
+    query = _from_template(_build_example_9)
     
     print("Example 9: Case-insensitive search")
     print("Fields: email, name, company")
@@ -613,42 +666,29 @@ def example_9_case_insensitive_search():
     return query
 
 
-def example_10_regex_pattern_matching():
-    """Advanced regex pattern matching"""
-    query = query_pb2.Query(
+def _build_example_10() -> query_pb2.Query:
+    """Template for example 10"""
+    return query_pb2.Query(
         entity="documents",
         filter=filter_pb2.Filter(
             and_=filter_pb2.AndFilter(
                 conditions=[
                     # Email format validation
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="contact_email",
-                            operator=filter_pb2.OPERATOR_MATCHES,
-                            value=Value(string_value=r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
-                        )
-                    ),
+                    _cond("contact_email", filter_pb2.OPERATOR_MATCHES, _V_STR[_EMAIL_PATTERN]),
                     # Phone format (US)
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="phone",
-                            operator=filter_pb2.OPERATOR_MATCHES,
-                            value=Value(string_value=r"^\+1-\d{3}-\d{3}-\d{4}$")
-                        )
-                    ),
+                    _cond("phone", filter_pb2.OPERATOR_MATCHES, _V_STR[_US_PHONE_PATTERN]),
                     # Document ID format
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="document_id",
-                            operator=filter_pb2.OPERATOR_MATCHES,
-                            value=Value(string_value=r"^DOC-\d{6}-[A-Z]{3}$")
-                        )
-                    )
+                    _cond("document_id", filter_pb2.OPERATOR_MATCHES, _V_STR[_DOCUMENT_ID_PATTERN])
                 ]
             )
         ),
         pagination=pagination_pb2.Pagination(page_size=50)
     )
+
+
+def example_10_regex_pattern_matching():
+    """Advanced regex pattern matching"""
+    query = _from_template(_build_example_10)
     
     print("Example 10: Regex pattern matching")
     print("Patterns: Email, Phone (US), Document ID")
@@ -663,29 +703,42 @@ def main():
     print("=" * 60)
     print()
     
-    examples = [
-        example_1_complex_boolean_logic,
-        example_2_negation_filter,
-        example_3_multi_level_aggregation,
-        example_4_percentile_aggregation,
-        example_5_explicit_join,
-        example_6_hybrid_search,
-        example_7_time_series_bucketing,
-        example_8_variance_stddev,
-        example_9_case_insensitive_search,
-        example_10_regex_pattern_matching
-    ]
+    examples = (
+        (example_1_complex_boolean_logic, _build_example_1),
+        (example_2_negation_filter, _build_example_2),
+        (example_3_multi_level_aggregation, _build_example_3),
+        (example_4_percentile_aggregation, _build_example_4),
+        (example_5_explicit_join, _build_example_5),
+        (example_6_hybrid_search, _build_example_6),
+        (example_7_time_series_bucketing, _build_example_7),
+        (example_8_variance_stddev, _build_example_8),
+        (example_9_case_insensitive_search, _build_example_9),
+        (example_10_regex_pattern_matching, _build_example_10)
+    )
+    
+    # Build and validate every template once, up front; the examples
+    # themselves only copy a cached template and set a timestamp.
+    failures = {}
+    for _, builder in examples:
+        try:
+            _template_bytes(builder)
+        except Exception as e:
+            failures[builder] = e
     
-    for example_func in examples:
+    for example_func, builder in examples:
         try:
+            if builder in failures:
+                raise failures[builder]
             result = example_func()
-            print("✓ Query constructed successfully")
-            print("-" * 60)
-            print()
+            if result.HasField("filter") and simplify(result.filter) is CONST_FALSE:
+                # Statically matches nothing: nothing to send
+                print("✓ Skipped: filter can never match")
+            else:
+                print("✓ Query constructed successfully")
         except Exception as e:
             print(f"✗ Error: {e}")
-            print("-" * 60)
-            print()
+        print("-" * 60)
+        print()
     
     print("=" * 60)
     print("All advanced examples completed!")
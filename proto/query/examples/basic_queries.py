@@ -8,392 +8,518 @@ Demonstrates:
 - Sorting and pagination
 - Field projection
 - Common query patterns
+
+Runs fastest on a native protobuf backend (upb, the default since
+protobuf 4.21, or cpp); a warning is issued on the pure-Python one.
 """
 
+from __future__ import annotations
+
+import functools
+import sys
+import time
 from google.protobuf.struct_pb2 import Value
-from gen.python.query.api.v1 import (
-    query_pb2,
-    filter_pb2,
-    sort_pb2,
-    pagination_pb2
-)
 
+from dsl import iso_ago
+from lazy_import import lazy_import
+from protobuf_backend import warn_if_pure_python
 
-def example_1_simple_equality():
-    """Find all active users"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="status",
-                operator=filter_pb2.OPERATOR_EQ,
-                value=Value(string_value="active")
+# Generated query modules, loaded on first use: importing them registers
+# every query descriptor, which dominates this module's import time. Same
+# package root as the other examples and filter_utils, so under run_all.py
+# the descriptors are registered once and shared.
+_API = "geniustechspace.query.api.v1."
+query_pb2 = lazy_import(_API + "query_pb2")
+filter_pb2 = lazy_import(_API + "filter_pb2")
+sort_pb2 = lazy_import(_API + "sort_pb2")
+
+
+warn_if_pure_python()
+
+
+_THIRTY_DAYS = 30 * 24 * 3600
+
+# (minute, timestamp) of the last computed cutoff; a 30-day window does not
+# need sub-minute freshness, so repeated calls within a minute reuse it.
+_ts_cache = None
+
+
+def _thirty_days_ago() -> str:
+    """UTC ISO-8601 timestamp for 30 days ago, recomputed once per minute"""
+    global _ts_cache
+    now = time.time()
+    minute = int(now // 60)
+    if _ts_cache is None or _ts_cache[0] != minute:
+        _ts_cache = (minute, iso_ago(_THIRTY_DAYS, now))
+    return _ts_cache[1]
+
+
+# Shared prototypes for values that recur across examples. Message-typed
+# constructor arguments are copied on assignment, so these are never
+# mutated by the queries that use them.
+@functools.lru_cache(maxsize=256)
+def _v_str(s: str) -> Value:
+    """Shared string Value; copied into messages, never mutate it"""
+    return Value(string_value=s)
+
+
+@functools.lru_cache(maxsize=256)
+def _v_num(n: float) -> Value:
+    """Shared number Value; copied into messages, never mutate it"""
+    return Value(number_value=n)
+
+
+_ELEVATED_ROLES = ("admin", "owner", "manager")
+_EXCLUDED_ROLES = ("guest", "suspended", "banned")
+
+# Projection field lists, extended straight into the repeated fields
+_DEFAULT_INCLUDES = ("id", "email", "profile.name", "created_at")
+_SENSITIVE_EXCLUDES = ("password_hash", "ssn", "credit_card.*")
+
+# Output separators
+_SEP_EQ = "=" * 60
+_SEP_DASH = "-" * 60
+
+
+def _emit(*lines: str) -> None:
+    """Write lines of demo output with a single write call"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Query specs
+#
+# Every basic example is one entity, an optional conjunction of leaf
+# conditions, sort keys, a projection, a page size and options. Each is
+# described by a QuerySpec below; QuerySpec.to_pb() is the only place the
+# examples' base queries are turned into protobuf messages.
+#
+# A condition is (field, operator, operand); the operand is a Value, a
+# tuple of Values for set operators, or None for null checks.
+
+
+class QuerySpec:
+    """
+    Plain-Python description of one basic query
+    
+    Holds everything an example needs before any protobuf call is made;
+    to_pb() turns it into a Query.
+    """
+    
+    __slots__ = ("entity", "where", "sort", "include", "exclude", "page_size", "options")
+    
+    def __init__(self, entity: str, where: tuple = (), sort: tuple = (),
+                 include: tuple = (), exclude: tuple = (), page_size: int = 50,
+                 options=None):
+        self.entity = entity
+        self.where = where
+        self.sort = sort
+        self.include = include
+        self.exclude = exclude
+        self.page_size = page_size
+        self.options = options
+    
+    def to_pb(self, query: query_pb2.Query = None) -> query_pb2.Query:
+        """
+        Build the described Query
+        
+        If a Query is given it is cleared and filled in place, so a caller
+        running the examples repeatedly can keep reusing one message.
+        """
+        if query is None:
+            query = query_pb2.Query()
+        else:
+            query.Clear()
+        query.entity = self.entity
+        if len(self.where) == 1:
+            _fill(query.filter.condition, *self.where[0])
+        elif self.where:
+            conditions = query.filter.and_.conditions
+            for where in self.where:
+                _fill(conditions.add().condition, *where)
+        query.sort.extend(self.sort)
+        if self.include:
+            query.projection.include.extend(self.include)
+        if self.exclude:
+            query.projection.exclude.extend(self.exclude)
+        query.pagination.page_size = self.page_size
+        if self.options is not None:
+            query.options.CopyFrom(self.options)
+        return query
+
+
+def _fill(cond: filter_pb2.Condition, field: str, operator: int, operand) -> None:
+    """Fill in one leaf condition from a spec entry"""
+    cond.field = field
+    cond.operator = operator
+    if isinstance(operand, tuple):
+        cond.values.extend(operand)
+    elif operand is not None:
+        cond.value.CopyFrom(operand)
+
+
+@functools.cache
+def _operator_selectivity() -> dict:
+    """Rough fraction of rows each operator keeps, when nothing better is known"""
+    return {
+        filter_pb2.OPERATOR_EQ: 0.1,
+        filter_pb2.OPERATOR_IS_NULL: 0.1,
+        filter_pb2.OPERATOR_IN: 0.2,
+        filter_pb2.OPERATOR_ARRAY_CONTAINS: 0.2,
+        filter_pb2.OPERATOR_LT: 0.3,
+        filter_pb2.OPERATOR_LTE: 0.3,
+        filter_pb2.OPERATOR_GT: 0.3,
+        filter_pb2.OPERATOR_GTE: 0.3,
+        filter_pb2.OPERATOR_STARTS_WITH: 0.4,
+        filter_pb2.OPERATOR_CONTAINS: 0.5,
+        filter_pb2.OPERATOR_NE: 0.9,
+        filter_pb2.OPERATOR_NOT_IN: 0.9,
+    }
+
+
+def _order_and(where: tuple, selectivity: dict = None) -> tuple:
+    """
+    Order AND-ed conditions most selective first
+    
+    Executors evaluate AND conditions left to right and stop at the first
+    false one, so the condition that rejects the most rows should lead.
+    
+    Args:
+        where: Spec conditions, (field, operator, operand) each
+        selectivity: Known fraction of rows kept per field; fields without
+            a hint fall back to a per-operator estimate
+    
+    Returns:
+        The conditions, stably sorted by estimated selectivity
+    """
+    selectivity = selectivity or {}
+    by_operator = _operator_selectivity()
+    return tuple(sorted(
+        where,
+        key=lambda cond: selectivity.get(cond[0], by_operator.get(cond[1], 0.5))
+    ))
+
+
+@functools.cache
+def _specs() -> dict:
+    """Example number -> QuerySpec, built on first use"""
+    sort_created_desc = sort_pb2.Sort(field="created_at", direction=sort_pb2.SORT_DIRECTION_DESC)
+    sort_status_asc = sort_pb2.Sort(field="status", direction=sort_pb2.SORT_DIRECTION_ASC)
+    
+    return {
+        1: QuerySpec("users", where=(("status", filter_pb2.OPERATOR_EQ, _v_str("active")),)),
+        2: QuerySpec(
+            "users",
+            where=(("created_at", filter_pb2.OPERATOR_GTE, None),),  # Cutoff set per call
+            sort=(sort_created_desc,),
+            page_size=100
+        ),
+        3: QuerySpec("users", where=_order_and(
+            (
+                ("status", filter_pb2.OPERATOR_EQ, _v_str("active")),
+                ("role", filter_pb2.OPERATOR_EQ, _v_str("admin"))
+            ),
+            {"status": 0.8, "role": 0.05}  # Admins are rare; most users are active
+        )),
+        4: QuerySpec(
+            "users",
+            where=(("role", filter_pb2.OPERATOR_IN, tuple(map(_v_str, _ELEVATED_ROLES))),),
+            page_size=100
+        ),
+        5: QuerySpec(
+            "users",
+            where=(("status", filter_pb2.OPERATOR_EQ, _v_str("active")),),
+            include=_DEFAULT_INCLUDES
+        ),
+        6: QuerySpec("users", exclude=_SENSITIVE_EXCLUDES),
+        7: QuerySpec("users", sort=(sort_status_asc, sort_created_desc)),
+        8: QuerySpec("users", where=(("deleted_at", filter_pb2.OPERATOR_IS_NULL, None),), page_size=100),
+        9: QuerySpec("users", where=(("email", filter_pb2.OPERATOR_CONTAINS, _v_str("@example.com")),)),
+        10: QuerySpec("users", where=(("status", filter_pb2.OPERATOR_EQ, _v_str("active")),), sort=(sort_created_desc,)),
+        11: QuerySpec("users", where=_order_and((
+            ("profile.country", filter_pb2.OPERATOR_EQ, _v_str("US")),
+            ("profile.age", filter_pb2.OPERATOR_GTE, _v_num(18))
+        ))),
+        12: QuerySpec("users", where=(("tags", filter_pb2.OPERATOR_ARRAY_CONTAINS, _v_str("premium")),)),
+        13: QuerySpec("users", where=(("status", filter_pb2.OPERATOR_NE, _v_str("pending")),)),
+        14: QuerySpec(
+            "users",
+            where=(("role", filter_pb2.OPERATOR_NOT_IN, tuple(map(_v_str, _EXCLUDED_ROLES))),),
+            page_size=100
+        ),
+        15: QuerySpec(
+            "users",
+            where=(("status", filter_pb2.OPERATOR_EQ, _v_str("active")),),
+            options=query_pb2.QueryOptions(
+                timeout_ms=5000,  # 5 second timeout
+                count_total=True,  # Get total count (expensive!)
+                consistency=query_pb2.CONSISTENCY_LEVEL_STRONG,
+                explain=False  # Set to True for debugging
             )
         ),
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    }
+
+
+def _load(name: str, query: query_pb2.Query = None) -> query_pb2.Query:
+    """
+    Rehydrate static example `name` from its cached bytes
     
-    print("Example 1: Find active users")
-    print(f"Entity: {query.entity}")
-    print(f"Filter: status = 'active'")
-    print(f"Page size: {query.pagination.page_size}\n")
+    For specs with repeated Value lists (IN / NOT_IN), where one parse is
+    cheaper than appending each Value to the repeated field again.
+    """
+    if query is None:
+        return get_query(name)
+    query.ParseFromString(get_query_bytes(name))  # Clears the message first
+    return query
+
+
+def example_1_simple_equality(query: query_pb2.Query = None):
+    """Find all active users"""
+    query = _specs()[1].to_pb(query)
+    
+    _emit(
+        "Example 1: Find active users",
+        f"Entity: {query.entity}",
+        f"Filter: status = 'active'",
+        f"Page size: {query.pagination.page_size}\n"
+    )
     return query
 
 
-def example_2_range_query():
+def example_2_range_query(query: query_pb2.Query = None):
     """Find users created in the last 30 days"""
-    from datetime import datetime, timedelta
+    thirty_days_ago = _thirty_days_ago()
     
-    thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).isoformat() + "Z"
+    query = _specs()[2].to_pb(query)
+    query.filter.condition.value.string_value = thirty_days_ago
     
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="created_at",
-                operator=filter_pb2.OPERATOR_GTE,
-                value=Value(string_value=thirty_days_ago)
-            )
-        ),
-        sort=[
-            sort_pb2.Sort(
-                field="created_at",
-                direction=sort_pb2.SORT_DIRECTION_DESC
-            )
-        ],
-        pagination=pagination_pb2.Pagination(page_size=100)
+    _emit(
+        "Example 2: Users created in last 30 days",
+        f"Filter: created_at >= '{thirty_days_ago}'",
+        f"Sort: created_at DESC\n"
     )
-    
-    print("Example 2: Users created in last 30 days")
-    print(f"Filter: created_at >= '{thirty_days_ago}'")
-    print(f"Sort: created_at DESC\n")
     return query
 
 
-def example_3_multiple_conditions():
+def example_3_multiple_conditions(query: query_pb2.Query = None):
     """Find active users with admin role"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="active")
-                        )
-                    ),
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="role",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="admin")
-                        )
-                    )
-                ]
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query = _specs()[3].to_pb(query)
     
-    print("Example 3: Active admin users")
-    print("Filter: status = 'active' AND role = 'admin'\n")
+    _emit(
+        "Example 3: Active admin users",
+        "Filter: role = 'admin' AND status = 'active' (most selective first)\n"
+    )
     return query
 
 
-def example_4_in_operator():
+def example_4_in_operator(query: query_pb2.Query = None):
     """Find users with specific roles"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="role",
-                operator=filter_pb2.OPERATOR_IN,
-                values=[
-                    Value(string_value="admin"),
-                    Value(string_value="owner"),
-                    Value(string_value="manager")
-                ]
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=100)
-    )
+    query = _load("example_4_in_operator", query)
     
-    print("Example 4: Users with elevated privileges")
-    print("Filter: role IN ('admin', 'owner', 'manager')\n")
+    _emit(
+        "Example 4: Users with elevated privileges",
+        "Filter: role IN ('admin', 'owner', 'manager')\n"
+    )
     return query
 
 
-def example_5_field_projection():
+def example_5_field_projection(query: query_pb2.Query = None):
     """Get only specific fields (email, name) for active users"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="status",
-                operator=filter_pb2.OPERATOR_EQ,
-                value=Value(string_value="active")
-            )
-        ),
-        projection=query_pb2.Projection(
-            include=["id", "email", "profile.name", "created_at"]
-        ),
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query = _specs()[5].to_pb(query)
     
-    print("Example 5: Project only needed fields")
-    print("Fields: id, email, profile.name, created_at")
-    print("Benefit: Reduced network overhead\n")
+    _emit(
+        "Example 5: Project only needed fields",
+        "Fields: id, email, profile.name, created_at",
+        "Benefit: Reduced network overhead\n"
+    )
     return query
 
 
-def example_6_exclude_sensitive_fields():
+def example_6_exclude_sensitive_fields(query: query_pb2.Query = None):
     """Get all user fields except sensitive ones"""
-    query = query_pb2.Query(
-        entity="users",
-        projection=query_pb2.Projection(
-            exclude=["password_hash", "ssn", "credit_card.*"]
-        ),
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query = _specs()[6].to_pb(query)
     
-    print("Example 6: Exclude sensitive fields")
-    print("Excluded: password_hash, ssn, credit_card.*\n")
+    _emit(
+        "Example 6: Exclude sensitive fields",
+        "Excluded: password_hash, ssn, credit_card.*\n"
+    )
     return query
 
 
-def example_7_sorting():
+def example_7_sorting(query: query_pb2.Query = None):
     """Get users sorted by multiple fields"""
-    query = query_pb2.Query(
-        entity="users",
-        sort=[
-            sort_pb2.Sort(
-                field="status",
-                direction=sort_pb2.SORT_DIRECTION_ASC
-            ),
-            sort_pb2.Sort(
-                field="created_at",
-                direction=sort_pb2.SORT_DIRECTION_DESC
-            )
-        ],
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query = _specs()[7].to_pb(query)
     
-    print("Example 7: Multi-field sorting")
-    print("Sort: status ASC, created_at DESC")
-    print("Result: Active users first, newest first within each status\n")
+    _emit(
+        "Example 7: Multi-field sorting",
+        "Sort: status ASC, created_at DESC",
+        "Result: Active users first, newest first within each status\n"
+    )
     return query
 
 
-def example_8_null_check():
+def example_8_null_check(query: query_pb2.Query = None):
     """Find users without deletion timestamp (not deleted)"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="deleted_at",
-                operator=filter_pb2.OPERATOR_IS_NULL
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=100)
-    )
+    query = _specs()[8].to_pb(query)
     
-    print("Example 8: Soft-deleted records check")
-    print("Filter: deleted_at IS NULL (active records only)\n")
+    _emit(
+        "Example 8: Soft-deleted records check",
+        "Filter: deleted_at IS NULL (active records only)\n"
+    )
     return query
 
 
-def example_9_string_contains():
+def example_9_string_contains(query: query_pb2.Query = None):
     """Find users with email containing specific domain"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="email",
-                operator=filter_pb2.OPERATOR_CONTAINS,
-                value=Value(string_value="@example.com"),
-                case_sensitive=False
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query = _specs()[9].to_pb(query)
     
-    print("Example 9: String contains (case-insensitive)")
-    print("Filter: email CONTAINS '@example.com'\n")
+    _emit(
+        "Example 9: String contains (case-insensitive)",
+        "Filter: email CONTAINS '@example.com'\n"
+    )
     return query
 
 
-def example_10_cursor_pagination():
+def example_10_cursor_pagination(query_page1: query_pb2.Query = None):
     """Paginate through results using cursor"""
     
     # First page
-    query_page1 = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="status",
-                operator=filter_pb2.OPERATOR_EQ,
-                value=Value(string_value="active")
-            )
-        ),
-        sort=[
-            sort_pb2.Sort(
-                field="created_at",
-                direction=sort_pb2.SORT_DIRECTION_DESC
-            )
-        ],
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query_page1 = _specs()[10].to_pb(query_page1)
     
-    print("Example 10: Cursor pagination")
-    print("Page 1: No cursor (start from beginning)")
+    _emit(
+        "Example 10: Cursor pagination",
+        "Page 1: No cursor (start from beginning)"
+    )
     
     # Simulate getting next page cursor from response
     # In real usage: cursor = response.pagination.next_cursor
     simulated_cursor = "eyJpZCI6MTIzLCJjcmVhdGVkX2F0IjoiMjAyNC0wMS0xNVQxMDowMDowMFoifQ=="
     
-    query_page2 = query_pb2.Query(
-        entity="users",
-        filter=query_page1.filter,
-        sort=query_page1.sort,
-        pagination=pagination_pb2.Pagination(
-            page_size=50,
-            cursor=simulated_cursor
-        )
-    )
+    # Page 2 is page 1 plus a cursor: one native MergeFrom() instead of
+    # rebuilding and copying filter and sort field by field
+    query_page2 = query_pb2.Query()
+    query_page2.MergeFrom(query_page1)
+    query_page2.pagination.cursor = simulated_cursor
     
-    print(f"Page 2: cursor = {simulated_cursor[:30]}...")
-    print("Benefit: O(log n) performance vs O(n) for offset\n")
+    _emit(
+        f"Page 2: cursor = {simulated_cursor[:30]}...",
+        "Benefit: O(log n) performance vs O(n) for offset\n"
+    )
     return query_page1, query_page2
 
 
-def example_11_nested_field_access():
+def example_11_nested_field_access(query: query_pb2.Query = None):
     """Filter by nested object field"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="profile.country",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="US")
-                        )
-                    ),
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="profile.age",
-                            operator=filter_pb2.OPERATOR_GTE,
-                            value=Value(number_value=18)
-                        )
-                    )
-                ]
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query = _specs()[11].to_pb(query)
     
-    print("Example 11: Nested field access")
-    print("Filter: profile.country = 'US' AND profile.age >= 18\n")
+    _emit(
+        "Example 11: Nested field access",
+        "Filter: profile.country = 'US' AND profile.age >= 18\n"
+    )
     return query
 
 
-def example_12_array_contains():
+def example_12_array_contains(query: query_pb2.Query = None):
     """Find users with specific tag"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="tags",
-                operator=filter_pb2.OPERATOR_ARRAY_CONTAINS,
-                value=Value(string_value="premium")
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query = _specs()[12].to_pb(query)
     
-    print("Example 12: Array contains")
-    print("Filter: 'premium' IN tags\n")
+    _emit(
+        "Example 12: Array contains",
+        "Filter: 'premium' IN tags\n"
+    )
     return query
 
 
-def example_13_not_equal():
+def example_13_not_equal(query: query_pb2.Query = None):
     """Find users not in pending status"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="status",
-                operator=filter_pb2.OPERATOR_NE,
-                value=Value(string_value="pending")
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=50)
-    )
+    query = _specs()[13].to_pb(query)
     
-    print("Example 13: Not equal")
-    print("Filter: status != 'pending'\n")
+    _emit(
+        "Example 13: Not equal",
+        "Filter: status != 'pending'\n"
+    )
     return query
 
 
-def example_14_not_in():
+def example_14_not_in(query: query_pb2.Query = None):
     """Find users excluding certain roles"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="role",
-                operator=filter_pb2.OPERATOR_NOT_IN,
-                values=[
-                    Value(string_value="guest"),
-                    Value(string_value="suspended"),
-                    Value(string_value="banned")
-                ]
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=100)
-    )
+    query = _load("example_14_not_in", query)
     
-    print("Example 14: Not in set")
-    print("Filter: role NOT IN ('guest', 'suspended', 'banned')\n")
+    _emit(
+        "Example 14: Not in set",
+        "Filter: role NOT IN ('guest', 'suspended', 'banned')\n"
+    )
     return query
 
 
-def example_15_with_options():
+def example_15_with_options(query: query_pb2.Query = None):
     """Query with execution options"""
-    query = query_pb2.Query(
-        entity="users",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="status",
-                operator=filter_pb2.OPERATOR_EQ,
-                value=Value(string_value="active")
-            )
-        ),
-        pagination=pagination_pb2.Pagination(page_size=50),
-        options=query_pb2.QueryOptions(
-            timeout_ms=5000,  # 5 second timeout
-            count_total=True,  # Get total count (expensive!)
-            consistency=query_pb2.CONSISTENCY_LEVEL_STRONG,
-            explain=False  # Set to True for debugging
-        )
-    )
+    query = _specs()[15].to_pb(query)
     
-    print("Example 15: Query with options")
-    print("Timeout: 5000ms")
-    print("Count total: True (warning: expensive!)")
-    print("Consistency: STRONG\n")
+    _emit(
+        "Example 15: Query with options",
+        "Timeout: 5000ms",
+        "Count total: True (warning: expensive!)",
+        "Consistency: STRONG\n"
+    )
     return query
 
 
+# Serialized-query cache
+#
+# Every example except 2 (time-relative cutoff) and 10 (two pages) builds a
+# fully static query, so its wire bytes are computed once and reused.
+
+_STATIC_EXAMPLES = {
+    func.__name__: number for number, func in (
+        (1, example_1_simple_equality),
+        (3, example_3_multiple_conditions),
+        (4, example_4_in_operator),
+        (5, example_5_field_projection),
+        (6, example_6_exclude_sensitive_fields),
+        (7, example_7_sorting),
+        (8, example_8_null_check),
+        (9, example_9_string_contains),
+        (11, example_11_nested_field_access),
+        (12, example_12_array_contains),
+        (13, example_13_not_equal),
+        (14, example_14_not_in),
+        (15, example_15_with_options)
+    )
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_query_bytes(name: str) -> bytes:
+    """
+    Serialized query of a static example, built once
+    
+    Args:
+        name: Example function name, e.g. "example_1_simple_equality"
+    
+    Returns:
+        Wire-format bytes, ready to send
+    
+    Raises:
+        KeyError: If name is not a static example
+    """
+    # Built from the spec, not the example function, which may itself
+    # rehydrate from this cache (see _load)
+    return _specs()[_STATIC_EXAMPLES[name]].to_pb().SerializeToString()
+
+
+def get_query(name: str) -> query_pb2.Query:
+    """Fresh, mutable copy of a static example's query"""
+    return query_pb2.Query.FromString(get_query_bytes(name))
+
+
 def main():
     """Run all basic examples"""
-    print("=" * 60)
-    print("BASIC QUERY EXAMPLES")
-    print("=" * 60)
-    print()
+    _emit(
+        _SEP_EQ,
+        "BASIC QUERY EXAMPLES",
+        _SEP_EQ,
+        ""
+    )
     
     examples = [
         example_1_simple_equality,
@@ -413,20 +539,32 @@ def main():
         example_15_with_options
     ]
     
-    for example_func in examples:
-        try:
-            result = example_func()
-            print("✓ Query constructed successfully")
-            print("-" * 60)
-            print()
-        except Exception as e:
-            print(f"✗ Error: {e}")
-            print("-" * 60)
-            print()
-    
-    print("=" * 60)
-    print("All basic examples completed!")
-    print("=" * 60)
+    # Results are printed and dropped, so one scratch message serves all.
+    # The examples are static builders, so a single guard around the loop
+    # reports which one failed, without a try block around every call.
+    scratch = query_pb2.Query()
+    number = 0
+    try:
+        for number, example_func in enumerate(examples, 1):
+            example_func(scratch)
+            _emit(
+                "✓ Query constructed successfully",
+                _SEP_DASH,
+                ""
+            )
+    except Exception as e:
+        _emit(
+            f"✗ Error in example {number}: {e}",
+            _SEP_DASH,
+            ""
+        )
+        raise
+    
+    _emit(
+        _SEP_EQ,
+        "All basic examples completed!",
+        _SEP_EQ
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Filter DSL - One-call constructors for Filter trees
+
+Each helper builds a complete Filter node in a single function call,
+instead of the nested Filter(condition=Condition(value=Value(...)))
+constructor syntax.
+
+Usage:
+    from dsl import and_, between, eq, gt
+
+    query.filter.CopyFrom(and_(
+        eq("category", "electronics"),
+        between("price", 100, 500),
+        gt("stock_quantity", 0)
+    ))
+"""
+
+from __future__ import annotations
+
+import functools
+import sys
+import time
+from array import array
+from typing import Any
+
+from lazy_import import lazy_import
+
+# Loaded on first use: importing the protobuf runtime dominates startup
+struct_pb2 = lazy_import("google.protobuf.struct_pb2")
+filter_pb2 = lazy_import("geniustechspace.query.api.v1.filter_pb2")
+
+
+@functools.lru_cache(maxsize=256, typed=True)
+def _to_value(value: Any) -> struct_pb2.Value:
+    """
+    Shared Value for a Python literal; copied into messages, never mutate it
+
+    typed=True keeps True and 1 apart, which hash and compare equal.
+    """
+    if isinstance(value, bool):
+        return struct_pb2.Value(bool_value=value)
+    if isinstance(value, (int, float)):
+        return struct_pb2.Value(number_value=value)
+    if isinstance(value, str):
+        return struct_pb2.Value(string_value=value)
+    raise TypeError(f"Unsupported filter value type: {type(value).__name__}")
+
+
+# Timestamps are sent as UTC ISO-8601 strings with second precision
+# (google.protobuf.Value has no timestamp kind)
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def iso(epoch: float) -> str:
+    """UTC ISO-8601 timestamp for a Unix time"""
+    return time.strftime(ISO_FORMAT, time.gmtime(epoch))
+
+
+def iso_ago(seconds: float, now: float = None) -> str:
+    """UTC ISO-8601 timestamp for the given number of seconds before now"""
+    return iso((time.time() if now is None else now) - seconds)
+
+
+def pack_float32(vector) -> bytes:
+    """
+    Pack an embedding vector as little-endian float32 bytes
+
+    The layout of Search.embedding_raw: one buffer instead of a
+    repeated float per component.
+    """
+    packed = array("f", vector)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _leaf(field: str, operator: int, value: Any) -> filter_pb2.Filter:
+    """Leaf filter with a single operand"""
+    return filter_pb2.Filter(condition=filter_pb2.Condition(
+        field=field, operator=operator, value=_to_value(value)
+    ))
+
+
+def _set(field: str, operator: int, values) -> filter_pb2.Filter:
+    """Leaf filter with a list of operands"""
+    return filter_pb2.Filter(condition=filter_pb2.Condition(
+        field=field, operator=operator, values=[_to_value(value) for value in values]
+    ))
+
+
+def eq(field: str, value: Any) -> filter_pb2.Filter:
+    """field = value"""
+    return _leaf(field, filter_pb2.OPERATOR_EQ, value)
+
+
+def ne(field: str, value: Any) -> filter_pb2.Filter:
+    """field != value"""
+    return _leaf(field, filter_pb2.OPERATOR_NE, value)
+
+
+def lt(field: str, value: Any) -> filter_pb2.Filter:
+    """field < value"""
+    return _leaf(field, filter_pb2.OPERATOR_LT, value)
+
+
+def lte(field: str, value: Any) -> filter_pb2.Filter:
+    """field <= value"""
+    return _leaf(field, filter_pb2.OPERATOR_LTE, value)
+
+
+def gt(field: str, value: Any) -> filter_pb2.Filter:
+    """field > value"""
+    return _leaf(field, filter_pb2.OPERATOR_GT, value)
+
+
+def gte(field: str, value: Any) -> filter_pb2.Filter:
+    """field >= value"""
+    return _leaf(field, filter_pb2.OPERATOR_GTE, value)
+
+
+def between(field: str, low: Any, high: Any) -> filter_pb2.Filter:
+    """low <= field <= high"""
+    return _set(field, filter_pb2.OPERATOR_BETWEEN, (low, high))
+
+
+def in_(field: str, values) -> filter_pb2.Filter:
+    """field IN (values); a single value becomes field = value"""
+    values = tuple(values)
+    if len(values) == 1:
+        return eq(field, values[0])
+    return _set(field, filter_pb2.OPERATOR_IN, values)
+
+
+def not_in(field: str, values) -> filter_pb2.Filter:
+    """field NOT IN (values); a single value becomes field != value"""
+    values = tuple(values)
+    if len(values) == 1:
+        return ne(field, values[0])
+    return _set(field, filter_pb2.OPERATOR_NOT_IN, values)
+
+
+def contains(field: str, value: str, case_sensitive: bool = False) -> filter_pb2.Filter:
+    """Substring match; case-insensitive unless case_sensitive"""
+    node = _leaf(field, filter_pb2.OPERATOR_CONTAINS, value)
+    node.condition.case_sensitive = case_sensitive
+    return node
+
+
+def matches(field: str, pattern: str, case_sensitive: bool = False) -> filter_pb2.Filter:
+    """RE2 pattern match; case-insensitive unless case_sensitive"""
+    node = _leaf(field, filter_pb2.OPERATOR_MATCHES, pattern)
+    node.condition.case_sensitive = case_sensitive
+    return node
+
+
+def array_contains_any(field: str, values) -> filter_pb2.Filter:
+    """Array field contains any of values"""
+    return _set(field, filter_pb2.OPERATOR_ARRAY_CONTAINS_ANY, values)
+
+
+def and_(*conditions: filter_pb2.Filter) -> filter_pb2.Filter:
+    """All conditions must match; nested ANDs are spliced in"""
+    return filter_pb2.Filter(and_=filter_pb2.AndFilter(conditions=_splice("and_", conditions)))
+
+
+def or_(*conditions: filter_pb2.Filter) -> filter_pb2.Filter:
+    """Any condition must match; nested ORs are spliced in"""
+    return filter_pb2.Filter(or_=filter_pb2.OrFilter(conditions=_splice("or_", conditions)))
+
+
+def not_(condition: filter_pb2.Filter) -> filter_pb2.Filter:
+    """Condition must not match"""
+    return filter_pb2.Filter(not_=filter_pb2.NotFilter(condition=condition))
+
+
+def _splice(kind: str, conditions) -> list:
+    """
+    Lift the children of same-kind nodes into one flat list
+
+    A AND (B AND C) is AND(A, B, C) by associativity. Trees built only
+    through these helpers therefore never nest an AND directly in an AND
+    (or an OR in an OR), so no separate flattening pass is needed.
+    """
+    flat = []
+    for condition in conditions:
+        if condition.WhichOneof("filter_type") == kind:
+            flat.extend(getattr(condition, kind).conditions)
+        else:
+            flat.append(condition)
+    return flat
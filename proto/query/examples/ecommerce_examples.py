@@ -10,118 +10,256 @@ Real-world scenarios for online retail:
 - Sales reports
 """
 
-from datetime import datetime, timedelta
-from google.protobuf.struct_pb2 import Value
-from geniustechspace.query.api.v1 import (
-    query_pb2,
-    filter_pb2,
-    sort_pb2,
-    aggregation_pb2,
-    search_pb2,
-    pagination_pb2
+from __future__ import annotations
+
+import contextlib
+import functools
+import io
+import sys
+import time
+from array import array
+
+from dsl import (
+    and_, array_contains_any, between, eq, gt, gte, in_, iso, iso_ago, lt, lte, ne,
+    pack_float32
 )
+from lazy_import import lazy_import
 
+# Generated modules load on first attribute access, so importing this module
+# (or running a single example) does not register every descriptor up front
+_API = "geniustechspace.query.api.v1."
+query_pb2 = lazy_import(_API + "query_pb2")
+filter_pb2 = lazy_import(_API + "filter_pb2")
+sort_pb2 = lazy_import(_API + "sort_pb2")
+aggregation_pb2 = lazy_import(_API + "aggregation_pb2")
+search_pb2 = lazy_import(_API + "search_pb2")
+pagination_pb2 = lazy_import(_API + "pagination_pb2")
 
-def example_1_product_search():
-    """Search products with multiple filters"""
+
+_HOUR = 3600
+_DAY = 24 * _HOUR
+
+
+def _midnight(now: float = None) -> int:
+    """Unix time of the start of the current UTC day"""
+    return int((time.time() if now is None else now) // _DAY) * _DAY
+
+
+# Estimated fraction of rows kept by a predicate on each field, used to
+# order AND conditions most selective first. Unlisted fields default to 0.5.
+_SELECTIVITY_HINTS = {
+    "customer_id": 0.01,
+    "tags": 0.05,
+    "category": 0.1,
+    "price": 0.2,
+    "total_amount": 0.3,
+    "payment_status": 0.5,
+    "status": 0.8,
+    "stock_quantity": 0.9,
+    "item_count": 0.9
+}
+
+@functools.cache
+def _operator_cost() -> dict:
+    """Relative per-row evaluation cost: equality < range < array < pattern match"""
+    return {
+        filter_pb2.OPERATOR_EQ: 1.0,
+        filter_pb2.OPERATOR_NE: 1.0,
+        filter_pb2.OPERATOR_LT: 1.1,
+        filter_pb2.OPERATOR_LTE: 1.1,
+        filter_pb2.OPERATOR_GT: 1.1,
+        filter_pb2.OPERATOR_GTE: 1.1,
+        filter_pb2.OPERATOR_IN: 1.2,
+        filter_pb2.OPERATOR_NOT_IN: 1.2,
+        filter_pb2.OPERATOR_BETWEEN: 1.2,
+        filter_pb2.OPERATOR_ARRAY_CONTAINS: 1.5,
+        filter_pb2.OPERATOR_ARRAY_CONTAINS_ANY: 2.0,
+        filter_pb2.OPERATOR_ARRAY_CONTAINS_ALL: 2.0,
+        filter_pb2.OPERATOR_CONTAINS: 3.0,
+        filter_pb2.OPERATOR_STARTS_WITH: 3.0,
+        filter_pb2.OPERATOR_ENDS_WITH: 3.0,
+        filter_pb2.OPERATOR_MATCHES: 5.0
+    }
+
+
+# Simulated 384-dim product embedding for example 6, held as one float32
+# buffer and encoded once at import instead of as a list of Python floats
+# per build.
+_DEMO_EMBEDDING = array("f", [0.123, -0.456, 0.789]) * 128
+_DEMO_EMBEDDING_RAW = pack_float32(_DEMO_EMBEDDING)
+
+
+def _fuse_conditions(conditions: list, into: filter_pb2.Filter = None) -> filter_pb2.Filter:
+    """
+    AND the given filters, fusing per-field predicates
+    
+    Nested ANDs are spliced into one flat list as it is built (dsl.and_),
+    OR-ed equalities on one field fold into a single IN and a GTE/LTE
+    pair on one field becomes a single BETWEEN, so the service plans one
+    predicate per attribute over a flat list instead of several.
+    
+    Pass into=query.filter to write the result straight into the query
+    instead of returning a temporary Filter for the caller to copy.
+    """
+    from filter_utils import fold_or_eq, fuse_ranges
+    node = and_(*conditions)
+    return _reorder_and(fuse_ranges(fold_or_eq(node)), into)
+
+
+def _reorder_and(node: filter_pb2.Filter, into: filter_pb2.Filter = None) -> filter_pb2.Filter:
+    """
+    Sort an AND's conditions by selectivity * operator cost
+    
+    Evaluators short-circuit AND left to right, so the cheap predicate that
+    rejects the most rows should run first. Leaf conditions on fields with
+    a known hint carry it in selectivity_hint; nested AND/OR/NOT nodes,
+    whose selectivity is unknown, go last.
+    """
+    cost = _operator_cost()
+
+    def score(child):
+        if child.WhichOneof("filter_type") != "condition":
+            return float("inf")
+        cond = child.condition
+        return _SELECTIVITY_HINTS.get(cond.field, 0.5) * cost.get(cond.operator, 1.0)
+    
+    conditions = node.and_.conditions
+    for child in conditions:
+        hint = _SELECTIVITY_HINTS.get(child.condition.field)
+        if child.WhichOneof("filter_type") == "condition" and hint is not None:
+            child.selectivity_hint = hint
+    result = filter_pb2.Filter() if into is None else into
+    result.and_.conditions.extend(sorted(conditions, key=score))
+    return result
+
+
+def build_query(entity: str, where: list = (), having: list = (), group_by: list = (),
+                aggregates: list = (), **fields) -> query_pb2.Query:
+    """
+    Build an aggregation query, pushing group-key HAVING predicates to WHERE
+    
+    A HAVING leaf condition on a group-by key filters the same groups
+    whether it runs before or after aggregation, so it is pushed down to
+    WHERE, where it prunes rows at scan time, before they reach the
+    GROUP BY hash table. Other HAVING predicates stay in HAVING. WHERE
+    predicates refer to row columns and are never moved, even if a field
+    shares its name with an aggregate alias.
+    
+    Args:
+        entity: Entity to query
+        where: Row-level predicates (Filter messages)
+        having: Group-level predicates (Filter messages)
+        group_by: Group-by keys
+        aggregates: Aggregate messages
+        **fields: Other Query fields (sort, pagination, ...)
+    
+    Returns:
+        The assembled Query
+    """
+    keys = set(group_by)
+    row_filters, group_filters = list(where), []
+    for predicate in having:
+        if predicate.WhichOneof("filter_type") == "condition" and predicate.condition.field in keys:
+            row_filters.append(predicate)
+        else:
+            group_filters.append(predicate)
+    
     query = query_pb2.Query(
-        entity="products",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    # Category filter
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="category",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="electronics")
-                        )
-                    ),
-                    # Price range
-                    filter_pb2.Filter(
-                        and_=filter_pb2.AndFilter(
-                            conditions=[
-                                filter_pb2.Filter(
-                                    condition=filter_pb2.Condition(
-                                        field="price",
-                                        operator=filter_pb2.OPERATOR_GTE,
-                                        value=Value(number_value=100)
-                                    )
-                                ),
-                                filter_pb2.Filter(
-                                    condition=filter_pb2.Condition(
-                                        field="price",
-                                        operator=filter_pb2.OPERATOR_LTE,
-                                        value=Value(number_value=500)
-                                    )
-                                )
-                            ]
-                        )
-                    ),
-                    # In stock
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="stock_quantity",
-                            operator=filter_pb2.OPERATOR_GT,
-                            value=Value(number_value=0)
-                        )
-                    ),
-                    # Active products only
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="active")
-                        )
-                    )
-                ]
-            )
-        ),
-        sort=[
-            sort_pb2.Sort(
-                field="popularity_score",
-                direction=sort_pb2.SORT_DIRECTION_DESC
-            )
-        ],
-        pagination=pagination_pb2.Pagination(page_size=24)  # Grid layout: 4x6
+        entity=entity,
+        aggregation=aggregation_pb2.Aggregation(group_by=group_by, aggregates=aggregates),
+        **fields
     )
+    if len(row_filters) == 1:
+        query.filter.CopyFrom(row_filters[0])
+    elif row_filters:
+        _fuse_conditions(row_filters, into=query.filter)
+    if len(group_filters) == 1:
+        query.aggregation.having.CopyFrom(group_filters[0])
+    elif group_filters:
+        query.aggregation.having.and_.conditions.extend(group_filters)
+    return query
+
+
+def normalize_query(query: query_pb2.Query) -> query_pb2.Query:
+    """
+    Put order-insensitive lists into a canonical order, in place
     
-    print("Example 1: Product search with filters")
-    print("Category: electronics")
-    print("Price: $100-$500")
-    print("In stock: Yes")
-    print("Sort: Popularity DESC\n")
+    Group-by keys, aggregates (by alias) and projected fields are sorted,
+    so the same semantic query built in any authoring order serializes to
+    identical bytes and hits one server-side plan-cache entry. Filter
+    condition order is left as built: it carries the selectivity ordering
+    from _reorder_and().
+    """
+    if query.HasField("aggregation"):
+        aggregation = query.aggregation
+        group_by = sorted(aggregation.group_by)
+        del aggregation.group_by[:]
+        aggregation.group_by.extend(group_by)
+        # Copy out before clearing: removed submessages are not kept alive
+        ordered = []
+        for aggregate in sorted(aggregation.aggregates, key=lambda aggregate: aggregate.alias):
+            ordered.append(aggregation_pb2.Aggregate())
+            ordered[-1].CopyFrom(aggregate)
+        del aggregation.aggregates[:]
+        aggregation.aggregates.extend(ordered)
+    if query.HasField("projection"):
+        projection = query.projection
+        for fields in (projection.include, projection.exclude):
+            ordered = sorted(fields)
+            del fields[:]
+            fields.extend(ordered)
     return query
 
 
-def example_2_order_history():
-    """Get customer's recent orders with details"""
-    customer_id = "cust_abc123"
+def example_1_product_search():
+    """Search products with multiple filters"""
+    # Projection, sort and pagination are filled in place, and the final
+    # AND is written into query.filter; the leaves and the fused
+    # predicates are still built as temporaries and copied in
+    query = query_pb2.Query(entity="products")
+    _fuse_conditions([
+        # Category filter
+        eq("category", "electronics"),
+        # Price range
+        between("price", 100, 500),
+        # In stock
+        gt("stock_quantity", 0),
+        # Active products only
+        eq("status", "active")
+    ], into=query.filter)
+    query.projection.include.extend([
+        "product_id",
+        "name",
+        "price",
+        "image_thumbnail",
+        "popularity_score",
+        "stock_quantity"
+    ])
+    sort = query.sort.add()
+    sort.field = "popularity_score"
+    sort.direction = sort_pb2.SORT_DIRECTION_DESC
+    query.pagination.page_size = 24  # Grid layout: 4x6
     
+    sys.stdout.write(
+        "Example 1: Product search with filters\n"
+        "Category: electronics\n"
+        "Price: $100-$500\n"
+        "In stock: Yes\n"
+        "Sort: Popularity DESC\n\n"
+    )
+    return normalize_query(query)
+
+
+def example_2_order_history(customer_id: str = "cust_abc123"):
+    """Get customer's recent orders with details"""
     query = query_pb2.Query(
         entity="orders",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    # Customer filter
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="customer_id",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value=customer_id)
-                        )
-                    ),
-                    # Not cancelled
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_NE,
-                            value=Value(string_value="cancelled")
-                        )
-                    )
-                ]
-            )
-        ),
+        filter=_fuse_conditions([
+            # Customer filter
+            eq("customer_id", customer_id),
+            # Not cancelled
+            ne("status", "cancelled")
+        ]),
         projection=query_pb2.Projection(
             include=[
                 "order_id",
@@ -142,94 +280,80 @@ def example_2_order_history():
         pagination=pagination_pb2.Pagination(page_size=10)
     )
     
-    print("Example 2: Customer order history")
-    print(f"Customer: {customer_id}")
-    print("Excluding cancelled orders")
-    print("Sort: Newest first\n")
-    return query
+    sys.stdout.write(
+        "Example 2: Customer order history\n"
+        f"Customer: {customer_id}\n"
+        "Excluding cancelled orders\n"
+        "Sort: Newest first\n\n"
+    )
+    return normalize_query(query)
 
 
 def example_3_low_stock_alert():
     """Find products with low inventory"""
     query = query_pb2.Query(
         entity="products",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    # Low stock threshold
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="stock_quantity",
-                            operator=filter_pb2.OPERATOR_LTE,
-                            value=Value(number_value=10)
-                        )
-                    ),
-                    # Not out of stock
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="stock_quantity",
-                            operator=filter_pb2.OPERATOR_GT,
-                            value=Value(number_value=0)
-                        )
-                    ),
-                    # Active products only
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="active")
-                        )
-                    )
-                ]
-            )
+        filter=_fuse_conditions([
+            # Low stock threshold
+            lte("stock_quantity", 10),
+            # Not out of stock
+            gt("stock_quantity", 0),
+            # Active products only
+            eq("status", "active")
+        ]),
+        projection=query_pb2.Projection(
+            include=[
+                "product_id",
+                "name",
+                "stock_quantity",
+                "reorder_point",
+                "supplier_id"
+            ]
         ),
         sort=[
             sort_pb2.Sort(
                 field="stock_quantity",
                 direction=sort_pb2.SORT_DIRECTION_ASC
+            ),
+            # Unique tie-break: many products share a stock level, and a
+            # cursor can only seek past the last row of a total order
+            sort_pb2.Sort(
+                field="product_id",
+                direction=sort_pb2.SORT_DIRECTION_ASC
             )
         ],
-        pagination=pagination_pb2.Pagination(page_size=100)
+        # No offset: pages are fetched with the returned cursor, which the
+        # service can resolve as an index seek on (stock_quantity, product_id)
+        pagination=pagination_pb2.Pagination(page_size=100),
+        options=query_pb2.QueryOptions(
+            # Equality on status, then a range on stock_quantity read in sort
+            # order: the index serves both the filter and the sort
+            index_hints=["idx_status_stock_quantity_product_id"]
+        )
     )
     
-    print("Example 3: Low stock alert")
-    print("Stock: 1-10 units")
-    print("Status: Active")
-    print("Sort: Lowest stock first\n")
-    return query
+    sys.stdout.write(
+        "Example 3: Low stock alert\n"
+        "Stock: 1-10 units\n"
+        "Status: Active\n"
+        "Sort: Lowest stock first\n\n"
+    )
+    return normalize_query(query)
 
 
-def example_4_daily_sales_report():
+def example_4_daily_sales_report(now: float = None):
     """Aggregate daily sales by category"""
-    today = datetime.utcnow().date().isoformat()
+    midnight = iso(_midnight(now))
+    today = midnight[:10]
     
     query = query_pb2.Query(
         entity="orders",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    # Today's orders
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="created_at",
-                            operator=filter_pb2.OPERATOR_GTE,
-                            value=Value(string_value=f"{today}T00:00:00Z")
-                        )
-                    ),
-                    # Completed only
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_IN,
-                            values=[
-                                Value(string_value="completed"),
-                                Value(string_value="shipped")
-                            ]
-                        )
-                    )
-                ]
-            )
-        ),
+        filter=_fuse_conditions([
+            # Today's orders
+            gte("created_at", midnight),
+            # Completed only
+            in_("status", ["completed", "shipped"])
+        ]),
         aggregation=aggregation_pb2.Aggregation(
             group_by=["category"],
             aggregates=[
@@ -249,6 +373,14 @@ def example_4_daily_sales_report():
                 )
             ]
         ),
+        projection=query_pb2.Projection(
+            include=[
+                "category",
+                "order_count",
+                "total_revenue",
+                "avg_order_value"
+            ]
+        ),
         sort=[
             sort_pb2.Sort(
                 field="total_revenue",
@@ -257,53 +389,49 @@ def example_4_daily_sales_report():
         ]
     )
     
-    print("Example 4: Daily sales report by category")
-    print(f"Date: {today}")
-    print("Metrics: Count, Revenue, AOV")
-    print("Group by: Category\n")
-    return query
+    sys.stdout.write(
+        "Example 4: Daily sales report by category\n"
+        f"Date: {today}\n"
+        "Metrics: Count, Revenue, AOV\n"
+        "Group by: Category\n\n"
+    )
+    return normalize_query(query)
 
 
 def example_5_customer_lifetime_value():
     """Calculate customer lifetime value (top spenders)"""
-    query = query_pb2.Query(
-        entity="orders",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="status",
-                operator=filter_pb2.OPERATOR_IN,
-                values=[
-                    Value(string_value="completed"),
-                    Value(string_value="shipped"),
-                    Value(string_value="delivered")
-                ]
-            )
-        ),
-        aggregation=aggregation_pb2.Aggregation(
-            group_by=["customer_id"],
-            aggregates=[
-                aggregation_pb2.Aggregate(
-                    function=aggregation_pb2.AGGREGATE_FUNCTION_COUNT,
-                    alias="order_count"
-                ),
-                aggregation_pb2.Aggregate(
-                    function=aggregation_pb2.AGGREGATE_FUNCTION_SUM,
-                    field="total_amount",
-                    alias="lifetime_value"
-                ),
-                aggregation_pb2.Aggregate(
-                    function=aggregation_pb2.AGGREGATE_FUNCTION_AVG,
-                    field="total_amount",
-                    alias="avg_order_value"
-                )
-            ],
-            having=filter_pb2.Filter(
-                condition=filter_pb2.Condition(
-                    field="order_count",
-                    operator=filter_pb2.OPERATOR_GTE,
-                    value=Value(number_value=5)
-                )
+    query = build_query(
+        "orders",
+        where=[
+            in_("status", ["completed", "shipped", "delivered"])
+        ],
+        having=[
+            gte("order_count", 5)
+        ],
+        group_by=["customer_id"],
+        aggregates=[
+            aggregation_pb2.Aggregate(
+                function=aggregation_pb2.AGGREGATE_FUNCTION_COUNT,
+                alias="order_count"
+            ),
+            aggregation_pb2.Aggregate(
+                function=aggregation_pb2.AGGREGATE_FUNCTION_SUM,
+                field="total_amount",
+                alias="lifetime_value"
+            ),
+            aggregation_pb2.Aggregate(
+                function=aggregation_pb2.AGGREGATE_FUNCTION_AVG,
+                field="total_amount",
+                alias="avg_order_value"
             )
+        ],
+        projection=query_pb2.Projection(
+            include=[
+                "customer_id",
+                "order_count",
+                "lifetime_value",
+                "avg_order_value"
+            ]
         ),
         sort=[
             sort_pb2.Sort(
@@ -314,100 +442,75 @@ def example_5_customer_lifetime_value():
         pagination=pagination_pb2.Pagination(page_size=100)
     )
     
-    print("Example 5: Customer lifetime value")
-    print("Filter: Completed orders only")
-    print("Having: At least 5 orders")
-    print("Sort: Highest LTV first\n")
-    return query
+    sys.stdout.write(
+        "Example 5: Customer lifetime value\n"
+        "Filter: Completed orders only\n"
+        "Having: At least 5 orders\n"
+        "Sort: Highest LTV first\n\n"
+    )
+    return normalize_query(query)
 
 
 def example_6_product_recommendations():
     """Find similar products using semantic search"""
-    product_embedding = [0.123, -0.456, 0.789] * 128  # 384-dim example
-    
     query = query_pb2.Query(
         entity="products",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    # In stock
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="stock_quantity",
-                            operator=filter_pb2.OPERATOR_GT,
-                            value=Value(number_value=0)
-                        )
-                    ),
-                    # Active
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="active")
-                        )
-                    )
-                ]
-            )
-        ),
+        filter=_fuse_conditions([
+            # In stock
+            gt("stock_quantity", 0),
+            # Active
+            eq("status", "active")
+        ]),
         search=search_pb2.Search(
             type=search_pb2.SEARCH_TYPE_SEMANTIC,
             vector_field="description_embedding",
-            embedding=product_embedding,
+            embedding_raw=_DEMO_EMBEDDING_RAW,
             min_score=0.7
         ),
+        projection=query_pb2.Projection(
+            include=[
+                "product_id",
+                "name",
+                "price",
+                "image_thumbnail"
+            ]
+        ),
         pagination=pagination_pb2.Pagination(page_size=10)
     )
     
-    print("Example 6: Product recommendations (semantic search)")
-    print("Method: Vector similarity")
-    print("Min similarity: 0.7")
-    print("Result: Similar products\n")
-    return query
+    sys.stdout.write(
+        "Example 6: Product recommendations (semantic search)\n"
+        "Method: Vector similarity\n"
+        "Min similarity: 0.7\n"
+        "Result: Similar products\n\n"
+    )
+    return normalize_query(query)
 
 
-def example_7_abandoned_carts():
+def example_7_abandoned_carts(now: float = None):
     """Find abandoned shopping carts (potential recovery)"""
-    cutoff_time = (datetime.utcnow() - timedelta(hours=24)).isoformat() + "Z"
+    cutoff_time = iso_ago(24 * _HOUR, now)
     
     query = query_pb2.Query(
         entity="carts",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    # Not checked out
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="active")
-                        )
-                    ),
-                    # Has items
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="item_count",
-                            operator=filter_pb2.OPERATOR_GT,
-                            value=Value(number_value=0)
-                        )
-                    ),
-                    # Not updated in last 24h
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="updated_at",
-                            operator=filter_pb2.OPERATOR_LT,
-                            value=Value(string_value=cutoff_time)
-                        )
-                    ),
-                    # Significant value
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="total_value",
-                            operator=filter_pb2.OPERATOR_GTE,
-                            value=Value(number_value=50)
-                        )
-                    )
-                ]
-            )
+        filter=_fuse_conditions([
+            # Not checked out
+            eq("status", "active"),
+            # Has items
+            gt("item_count", 0),
+            # Not updated in last 24h
+            lt("updated_at", cutoff_time),
+            # Significant value
+            gte("total_value", 50)
+        ]),
+        projection=query_pb2.Projection(
+            include=[
+                "cart_id",
+                "customer_id",
+                "item_count",
+                "total_value",
+                "updated_at"
+            ]
         ),
         sort=[
             sort_pb2.Sort(
@@ -418,43 +521,25 @@ def example_7_abandoned_carts():
         pagination=pagination_pb2.Pagination(page_size=100)
     )
     
-    print("Example 7: Abandoned carts recovery")
-    print("Abandoned: >24 hours ago")
-    print("Value: >$50")
-    print("Sort: Highest value first\n")
-    return query
+    sys.stdout.write(
+        "Example 7: Abandoned carts recovery\n"
+        "Abandoned: >24 hours ago\n"
+        "Value: >$50\n"
+        "Sort: Highest value first\n\n"
+    )
+    return normalize_query(query)
 
 
 def example_8_seasonal_products():
     """Find seasonal products with tags"""
     query = query_pb2.Query(
         entity="products",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    # Has seasonal tag
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="tags",
-                            operator=filter_pb2.OPERATOR_ARRAY_CONTAINS_ANY,
-                            values=[
-                                Value(string_value="holiday"),
-                                Value(string_value="christmas"),
-                                Value(string_value="winter")
-                            ]
-                        )
-                    ),
-                    # In stock
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="stock_quantity",
-                            operator=filter_pb2.OPERATOR_GT,
-                            value=Value(number_value=0)
-                        )
-                    )
-                ]
-            )
-        ),
+        filter=_fuse_conditions([
+            # Has seasonal tag
+            array_contains_any("tags", ["holiday", "christmas", "winter"]),
+            # In stock
+            gt("stock_quantity", 0)
+        ]),
         projection=query_pb2.Projection(
             include=[
                 "product_id",
@@ -474,50 +559,27 @@ def example_8_seasonal_products():
         pagination=pagination_pb2.Pagination(page_size=50)
     )
     
-    print("Example 8: Seasonal products")
-    print("Tags: holiday, christmas, winter (any)")
-    print("In stock: Yes")
-    print("Sort: Most popular\n")
-    return query
+    sys.stdout.write(
+        "Example 8: Seasonal products\n"
+        "Tags: holiday, christmas, winter (any)\n"
+        "In stock: Yes\n"
+        "Sort: Most popular\n\n"
+    )
+    return normalize_query(query)
 
 
 def example_9_high_value_pending_orders():
     """Monitor high-value orders pending fulfillment"""
     query = query_pb2.Query(
         entity="orders",
-        filter=filter_pb2.Filter(
-            and_=filter_pb2.AndFilter(
-                conditions=[
-                    # Pending status
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="status",
-                            operator=filter_pb2.OPERATOR_IN,
-                            values=[
-                                Value(string_value="pending"),
-                                Value(string_value="processing")
-                            ]
-                        )
-                    ),
-                    # High value
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="total_amount",
-                            operator=filter_pb2.OPERATOR_GTE,
-                            value=Value(number_value=1000)
-                        )
-                    ),
-                    # Payment confirmed
-                    filter_pb2.Filter(
-                        condition=filter_pb2.Condition(
-                            field="payment_status",
-                            operator=filter_pb2.OPERATOR_EQ,
-                            value=Value(string_value="confirmed")
-                        )
-                    )
-                ]
-            )
-        ),
+        filter=_fuse_conditions([
+            # Pending status
+            in_("status", ["pending", "processing"]),
+            # High value
+            gte("total_amount", 1000),
+            # Payment confirmed
+            eq("payment_status", "confirmed")
+        ]),
         projection=query_pb2.Projection(
             include=[
                 "order_id",
@@ -534,58 +596,62 @@ def example_9_high_value_pending_orders():
             sort_pb2.Sort(
                 field="created_at",
                 direction=sort_pb2.SORT_DIRECTION_ASC  # Oldest first
+            ),
+            # Unique tie-break so the cursor position is exact
+            sort_pb2.Sort(
+                field="order_id",
+                direction=sort_pb2.SORT_DIRECTION_ASC
             )
         ],
-        pagination=pagination_pb2.Pagination(page_size=50)
+        # Cursor pagination (no offset) over (created_at, order_id)
+        pagination=pagination_pb2.Pagination(page_size=50),
+        options=query_pb2.QueryOptions(
+            # One created_at-ordered run per status value, merged: no sort step
+            index_hints=["idx_status_payment_status_created_at"]
+        )
     )
     
-    print("Example 9: High-value pending orders")
-    print("Status: Pending/Processing")
-    print("Value: ≥$1000")
-    print("Sort: Oldest first (priority fulfillment)\n")
-    return query
+    sys.stdout.write(
+        "Example 9: High-value pending orders\n"
+        "Status: Pending/Processing\n"
+        "Value: ≥$1000\n"
+        "Sort: Oldest first (priority fulfillment)\n\n"
+    )
+    return normalize_query(query)
 
 
-def example_10_product_performance_report():
+def example_10_product_performance_report(now: float = None):
     """Analyze product performance (last 30 days)"""
-    thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).isoformat() + "Z"
+    thirty_days_ago = iso_ago(30 * _DAY, now)
     
-    query = query_pb2.Query(
-        entity="order_items",
-        filter=filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field="order.created_at",
-                operator=filter_pb2.OPERATOR_GTE,
-                value=Value(string_value=thirty_days_ago)
-            )
-        ),
-        aggregation=aggregation_pb2.Aggregation(
-            group_by=["product_id", "product_name"],
-            aggregates=[
-                aggregation_pb2.Aggregate(
-                    function=aggregation_pb2.AGGREGATE_FUNCTION_SUM,
-                    field="quantity",
-                    alias="units_sold"
-                ),
-                aggregation_pb2.Aggregate(
-                    function=aggregation_pb2.AGGREGATE_FUNCTION_SUM,
-                    field="line_total",
-                    alias="revenue"
-                ),
-                aggregation_pb2.Aggregate(
-                    function=aggregation_pb2.AGGREGATE_FUNCTION_COUNT_DISTINCT,
-                    field="order_id",
-                    alias="order_count"
-                )
-            ],
-            having=filter_pb2.Filter(
-                condition=filter_pb2.Condition(
-                    field="units_sold",
-                    operator=filter_pb2.OPERATOR_GTE,
-                    value=Value(number_value=10)
-                )
+    query = build_query(
+        "order_items",
+        where=[
+            gte("order.created_at", thirty_days_ago)
+        ],
+        having=[
+            gte("units_sold", 10)
+        ],
+        group_by=["product_id", "product_name"],
+        aggregates=[
+            aggregation_pb2.Aggregate(
+                function=aggregation_pb2.AGGREGATE_FUNCTION_SUM,
+                field="quantity",
+                alias="units_sold"
+            ),
+            aggregation_pb2.Aggregate(
+                function=aggregation_pb2.AGGREGATE_FUNCTION_SUM,
+                field="line_total",
+                alias="revenue"
+            ),
+            aggregation_pb2.Aggregate(
+                function=aggregation_pb2.AGGREGATE_FUNCTION_COUNT_DISTINCT,
+                field="order_id",
+                # HyperLogLog instead of a per-product set of 30 days of order IDs
+                error_tolerance=0.02,
+                alias="order_count"
             )
-        ),
+        ],
         sort=[
             sort_pb2.Sort(
                 field="revenue",
@@ -595,19 +661,165 @@ def example_10_product_performance_report():
         pagination=pagination_pb2.Pagination(page_size=100)
     )
     
-    print("Example 10: Product performance (30 days)")
-    print("Metrics: Units sold, Revenue, Orders")
-    print("Having: At least 10 units sold")
-    print("Sort: Highest revenue first\n")
-    return query
+    sys.stdout.write(
+        "Example 10: Product performance (30 days)\n"
+        "Metrics: Units sold, Revenue, Orders (approximate, ±2%)\n"
+        "Having: At least 10 units sold\n"
+        "Sort: Highest revenue first\n\n"
+    )
+    return normalize_query(query)
+
+
+# Serialized-query cache
+#
+# Examples 4, 7 and 10 depend on the current time; their cutoffs are
+# rounded down to the hour so one cached build serves a whole hour.
+# Every other example is fully static and is built once.
+
+_STATIC_EXAMPLES = {
+    func.__name__: func for func in (
+        example_1_product_search,
+        example_2_order_history,
+        example_3_low_stock_alert,
+        example_5_customer_lifetime_value,
+        example_6_product_recommendations,
+        example_8_seasonal_products,
+        example_9_high_value_pending_orders
+    )
+}
+
+_TIMED_EXAMPLES = {
+    func.__name__: func for func in (
+        example_4_daily_sales_report,
+        example_7_abandoned_carts,
+        example_10_product_performance_report
+    )
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _query_bytes(name: str, hour: int = None) -> bytes:
+    """Build an example once per (name, hour) and keep its wire bytes"""
+    with contextlib.redirect_stdout(io.StringIO()):  # Skip the demo output
+        if hour is None:
+            query = _STATIC_EXAMPLES[name]()
+        else:
+            query = _TIMED_EXAMPLES[name](now=hour)
+    return query.SerializeToString()
+
+
+def get_query_bytes(name: str, now: float = None) -> bytes:
+    """
+    Serialized query of an example, built at most once per hour
+    
+    Args:
+        name: Example function name, e.g. "example_1_product_search"
+        now: Reference Unix time for time-dependent examples (default: now)
+    
+    Returns:
+        Wire-format bytes, ready to send
+    
+    Raises:
+        KeyError: If name is not an example
+    """
+    if name in _TIMED_EXAMPLES:
+        hour = int((time.time() if now is None else now) // _HOUR) * _HOUR
+        return _query_bytes(name, hour)
+    if name not in _STATIC_EXAMPLES:
+        raise KeyError(name)
+    return _query_bytes(name)
+
+
+def get_query(name: str, now: float = None) -> query_pb2.Query:
+    """Fresh, mutable copy of an example's query"""
+    return query_pb2.Query.FromString(get_query_bytes(name, now))
+
+
+# Specialized builders
+#
+# Order history is fetched per customer with an otherwise identical query.
+# specialize() serializes such an example once with a placeholder argument
+# and builds every later query by splicing the real argument into those
+# bytes, without running the example's filter, projection and sort code.
+
+def _varint(n: int) -> bytes:
+    """Protobuf base-128 varint encoding of a non-negative int"""
+    out = bytearray()
+    while n > 0x7f:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def specialize(example, parameter: str):
+    """
+    Compile an example with one string parameter into a byte-splicing builder
+    
+    Protobuf strings are length-prefixed, and so is every message that
+    encloses one, so only an argument of the placeholder's encoded length
+    can be spliced in without re-encoding the enclosing lengths. Templates
+    are therefore built (once) per argument length; IDs of a fixed format
+    all share one. An empty argument has no marker to find, so that query
+    is built directly.
+    
+    Args:
+        example: Example function taking parameter as a keyword argument
+        parameter: Name of the string parameter to substitute
+    
+    Returns:
+        Function taking the argument and returning the Query
+    
+    Raises:
+        ValueError: If the argument does not occur exactly once in the query
+    """
+    @functools.lru_cache(maxsize=16)
+    def template(length: int) -> tuple:
+        # A run of DEL characters: valid UTF-8, one byte each, and not
+        # something the example's literal text contains
+        marker = b"\x7f" * length
+        with contextlib.redirect_stdout(io.StringIO()):  # Skip the demo output
+            data = example(**{parameter: marker.decode()}).SerializeToString()
+        # Matched together with the string's varint length prefix, which is
+        # itself 0x7f for length 127; the preceding tag byte never is
+        encoded = _varint(length) + marker
+        offset = data.find(encoded)
+        if offset < 0 or data.find(encoded, offset + 1) >= 0:
+            raise ValueError(f"{parameter} must appear exactly once in {example.__name__}")
+        offset += len(encoded) - length
+        return data[:offset], data[offset + length:]
+
+    def build(value: str) -> query_pb2.Query:
+        encoded = value.encode()
+        if not encoded:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return example(**{parameter: value})
+        head, tail = template(len(encoded))
+        return query_pb2.Query.FromString(head + encoded + tail)
+
+    build.__name__ = f"{example.__name__}_specialized"
+    build.__doc__ = f"{example.__name__}({parameter}=...) from a cached byte template"
+    return build
+
+
+_order_history = specialize(example_2_order_history, "customer_id")
+
+
+def make_order_history(customer_id: str) -> query_pb2.Query:
+    """
+    Order-history query for one customer, from a cached byte template
+    
+    Same query as example_2_order_history(customer_id), built as one
+    concatenation and parse instead of in Python on every call.
+    """
+    return _order_history(customer_id)
 
 
 def main():
     """Run all e-commerce examples"""
-    print("=" * 60)
-    print("E-COMMERCE QUERY EXAMPLES")
-    print("=" * 60)
-    print()
+    banner = "=" * 60
+    rule = "-" * 60
+    sys.stdout.write(f"{banner}\nE-COMMERCE QUERY EXAMPLES\n{banner}\n\n")
     
     examples = [
         example_1_product_search,
@@ -625,17 +837,21 @@ def main():
     for example_func in examples:
         try:
             result = example_func()
-            print("✓ Query constructed successfully")
-            print("-" * 60)
-            print()
+            sys.stdout.write(f"✓ Query constructed successfully\n{rule}\n\n")
         except Exception as e:
-            print(f"✗ Error: {e}")
-            print("-" * 60)
-            print()
+            sys.stdout.write(f"✗ Error: {e}\n{rule}\n\n")
+    
+    # The spliced builder must match the example at every length, including
+    # either side of the one-to-two-byte varint boundary (127 / 128)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for length in (0, 1, 126, 127, 128, 129, 16383, 16384):
+            customer_id = "c" * length
+            expected = example_2_order_history(customer_id).SerializeToString()
+            if make_order_history(customer_id).SerializeToString() != expected:
+                raise AssertionError(f"make_order_history differs at length {length}")
+    sys.stdout.write(f"✓ Specialized order history matches example 2\n{rule}\n\n")
     
-    print("=" * 60)
-    print("All e-commerce examples completed!")
-    print("=" * 60)
+    sys.stdout.write(f"{banner}\nAll e-commerce examples completed!\n{banner}\n")
 
 
 if __name__ == "__main__":
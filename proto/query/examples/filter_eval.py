@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Filter Evaluator - Run Filter trees against in-memory records
+
+Compiles a Filter once into nested Python closures, one per node, with
+operands converted, regexes compiled and field paths split up front.
+Evaluating a record is then a chain of direct calls instead of a walk
+over the protobuf tree, which makes client-side prefiltering and
+simulating queries against fixture data cheap.
+
+Usage:
+    from filter_eval import compile_filter
+
+    matches = compile_filter(query.filter)
+    hits = [row for row in rows if matches(row)]
+
+Records are dicts; dotted field paths ("profile.country") descend into
+nested dicts. A missing field reads as None. As in SQL, a comparison
+with None is unknown rather than false: NOT keeps it unknown, AND and OR
+follow three-valued logic, and a record matches only if the whole
+filter is true. NOT (price < 10) therefore matches the same records as
+price >= 10, the rewrite filter_utils.push_not() makes.
+
+case_sensitive only affects CONTAINS, STARTS_WITH, ENDS_WITH and MATCHES,
+as documented in filter.proto.
+"""
+
+from __future__ import annotations
+
+import functools
+import operator
+import re
+from typing import Any, Callable, Optional
+
+from lazy_import import lazy_import
+
+# Loaded on first use, like the other example modules
+json_format = lazy_import("google.protobuf.json_format")
+struct_pb2 = lazy_import("google.protobuf.struct_pb2")
+filter_pb2 = lazy_import("geniustechspace.query.api.v1.filter_pb2")
+
+
+Predicate = Callable[[dict], bool]
+
+# Compiled node: True, False, or None for unknown
+_Node = Callable[[dict], Optional[bool]]
+
+
+@functools.cache
+def _comparisons() -> dict:
+    """Ordering operators and their Python comparisons"""
+    return {
+        filter_pb2.OPERATOR_LT: operator.lt,
+        filter_pb2.OPERATOR_LTE: operator.le,
+        filter_pb2.OPERATOR_GT: operator.gt,
+        filter_pb2.OPERATOR_GTE: operator.ge,
+    }
+
+
+@functools.cache
+def _string_tests() -> dict:
+    """Substring operators and their tests, as (text, operand)"""
+    return {
+        filter_pb2.OPERATOR_CONTAINS: lambda text, operand: operand in text,
+        filter_pb2.OPERATOR_STARTS_WITH: str.startswith,
+        filter_pb2.OPERATOR_ENDS_WITH: str.endswith,
+    }
+
+
+@functools.cache
+def _case_operators() -> frozenset:
+    """Operators case_sensitive applies to"""
+    return frozenset(_string_tests()) | {filter_pb2.OPERATOR_MATCHES}
+
+
+def compile_filter(node: filter_pb2.Filter) -> Predicate:
+    """
+    Compile a filter tree into a predicate over records
+
+    Compiled predicates are cached by the filter's serialized form, so
+    compiling the same filter again is a dictionary lookup.
+
+    Args:
+        node: Filter tree to compile (left unmodified)
+
+    Returns:
+        Function taking a record dict and returning True if it matches
+
+    Raises:
+        ValueError: If the tree uses an unsupported operator, BETWEEN
+            without exactly two values, or an invalid MATCHES pattern
+    """
+    return _compile_bytes(node.SerializeToString(deterministic=True))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_bytes(data: bytes) -> Predicate:
+    """Compile a serialized filter, memoized"""
+    root = _compile(filter_pb2.Filter.FromString(data))
+    # Unknown does not match
+    return lambda record: root(record) is True
+
+
+def _compile(node: filter_pb2.Filter) -> _Node:
+    """Closure for one filter node"""
+    kind = node.WhichOneof("filter_type")
+    if kind == "and_":
+        children = tuple(_compile(child) for child in node.and_.conditions)
+        return lambda record: _all(child(record) for child in children)
+    if kind == "or_":
+        children = tuple(_compile(child) for child in node.or_.conditions)
+        return lambda record: _any(child(record) for child in children)
+    if kind == "not_":
+        child = _compile(node.not_.condition)
+        return lambda record: None if (result := child(record)) is None else not result
+    if kind == "condition":
+        return _compile_condition(node.condition)
+    # An empty filter matches everything
+    return lambda record: True
+
+
+def _all(results) -> Optional[bool]:
+    """Three-valued AND: false wins over unknown, unknown over true"""
+    unknown = False
+    for result in results:
+        if result is False:
+            return False
+        if result is None:
+            unknown = True
+    return None if unknown else True
+
+
+def _any(results) -> Optional[bool]:
+    """Three-valued OR: true wins over unknown, unknown over false"""
+    unknown = False
+    for result in results:
+        if result is True:
+            return True
+        if result is None:
+            unknown = True
+    return None if unknown else False
+
+
+def _compile_condition(cond: filter_pb2.Condition) -> _Node:
+    """Closure for one leaf condition"""
+    get = _getter(cond.field)
+    op = cond.operator
+
+    if op == filter_pb2.OPERATOR_IS_NULL:
+        return lambda record: get(record) is None
+    if op == filter_pb2.OPERATOR_IS_NOT_NULL:
+        return lambda record: get(record) is not None
+
+    fold = op in _case_operators() and not cond.case_sensitive
+    value = _normalize(_python(cond.value), fold)
+    values = tuple(_normalize(_python(item), fold) for item in cond.values)
+    test = _leaf_test(cond, op, value, values, fold)
+
+    # MATCHES folds through re.IGNORECASE, on the field as stored
+    fold_field = fold and op != filter_pb2.OPERATOR_MATCHES
+
+    def evaluate(record):
+        field = get(record)
+        # Comparing with null is unknown, as in SQL
+        if field is None:
+            return None
+        return test(_normalize(field, fold_field))
+    return evaluate
+
+
+def _leaf_test(cond: filter_pb2.Condition, op: int, value: Any, values: tuple,
+               fold: bool) -> Callable[[Any], Optional[bool]]:
+    """Test for a non-null field value"""
+    if op in (filter_pb2.OPERATOR_EQ, filter_pb2.OPERATOR_NE) and value is None:
+        return lambda field: None
+    if op == filter_pb2.OPERATOR_EQ:
+        return lambda field: field == value
+    if op == filter_pb2.OPERATOR_NE:
+        return lambda field: field != value
+    if op in _comparisons():
+        compare = _comparisons()[op]
+        return lambda field: _ordered(compare, field, value)
+    if op == filter_pb2.OPERATOR_BETWEEN:
+        if len(values) != 2:
+            raise ValueError(
+                f"BETWEEN on {cond.field!r} needs exactly 2 values, got {len(values)}"
+            )
+        low, high = values
+        return lambda field: _all((
+            _ordered(operator.ge, field, low),
+            _ordered(operator.le, field, high)
+        ))
+    if op in (filter_pb2.OPERATOR_IN, filter_pb2.OPERATOR_NOT_IN):
+        members = _member_set(values)
+        if op == filter_pb2.OPERATOR_IN:
+            return lambda field: _contains(members, values, field)
+        return lambda field: not _contains(members, values, field)
+    if op in _string_tests():
+        string_test = _string_tests()[op]
+        return lambda field: isinstance(field, str) and string_test(field, value)
+    if op == filter_pb2.OPERATOR_MATCHES:
+        # Compile the pattern as written: case-folding it would turn \D into \d
+        try:
+            pattern = re.compile(cond.value.string_value, re.IGNORECASE if fold else 0)
+        except re.error as e:
+            raise ValueError(f"Invalid MATCHES pattern on {cond.field!r}: {e}") from e
+        return lambda field: isinstance(field, str) and pattern.search(field) is not None
+    if op == filter_pb2.OPERATOR_ARRAY_CONTAINS:
+        return lambda field: isinstance(field, list) and value in field
+    if op == filter_pb2.OPERATOR_ARRAY_CONTAINS_ANY:
+        return lambda field: isinstance(field, list) and any(item in field for item in values)
+    if op == filter_pb2.OPERATOR_ARRAY_CONTAINS_ALL:
+        return lambda field: isinstance(field, list) and all(item in field for item in values)
+    raise ValueError(f"Unsupported operator: {filter_pb2.Operator.Name(op)}")
+
+
+def _getter(path: str) -> Callable[[dict], Any]:
+    """Accessor for a dotted field path, split once"""
+    keys = tuple(path.split("."))
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda record: record.get(key)
+
+    def get(record):
+        for key in keys:
+            if not isinstance(record, dict):
+                return None
+            record = record.get(key)
+        return record
+    return get
+
+
+def _python(value: struct_pb2.Value) -> Any:
+    """Python equivalent of a protobuf Value (None if unset or null)"""
+    kind = value.WhichOneof("kind")
+    if kind in (None, "null_value"):
+        return None
+    if kind in ("list_value", "struct_value"):
+        return json_format.MessageToDict(value)
+    return getattr(value, kind)
+
+
+def _normalize(value: Any, fold: bool) -> Any:
+    """Case-fold strings (and strings in lists) for case-insensitive conditions"""
+    if not fold:
+        return value
+    if isinstance(value, str):
+        return value.casefold()
+    if isinstance(value, list):
+        return [item.casefold() if isinstance(item, str) else item for item in value]
+    return value
+
+
+def _ordered(compare, field: Any, operand: Any) -> Optional[bool]:
+    """Ordering comparison; unknown for nulls, False for incomparable types"""
+    if field is None or operand is None:
+        return None
+    try:
+        return compare(field, operand)
+    except TypeError:
+        return False
+
+
+def _member_set(values: tuple):
+    """Hash set of the operands, or None if any is unhashable"""
+    try:
+        return frozenset(values)
+    except TypeError:
+        return None
+
+
+def _contains(members, values: tuple, field: Any) -> bool:
+    """Set membership, falling back to a scan for unhashable values"""
+    if members is not None:
+        try:
+            return field in members
+        except TypeError:
+            pass
+    return field in values
+
+
+def main():
+    """Check the evaluator against records with known outcomes"""
+    from dsl import and_, between, contains, eq, in_, lt, matches, not_, or_
+    from filter_utils import push_not
+
+    not_cheap = not_(lt("price", 10))
+    checks = [
+        ("EQ is case-sensitive", eq("status", "active"), {"status": "ACTIVE"}, False),
+        ("IN is case-sensitive", in_("role", ["admin", "owner"]), {"role": "ADMIN"}, False),
+        ("CONTAINS folds case by default", contains("name", "ali"), {"name": "Alice"}, True),
+        ("CONTAINS honors case_sensitive", contains("name", "ali", case_sensitive=True), {"name": "Alice"}, False),
+        ("NOT over a null comparison is unknown", not_cheap, {}, False),
+        ("NOT over a false comparison", not_cheap, {"price": 20}, True),
+        ("push_not agrees on null", push_not(not_cheap), {}, False),
+        ("OR: true beats unknown", or_(lt("price", 10), eq("status", "active")), {"status": "active"}, True),
+        ("NOT over AND: false beats unknown", not_(and_(lt("price", 10), eq("status", "x"))), {"status": "y"}, True),
+    ]
+
+    failures = 0
+    for description, node, record, expected in checks:
+        if compile_filter(node)(record) == expected:
+            print(f"✓ {description}")
+        else:
+            print(f"✗ {description}: expected {expected}")
+            failures += 1
+
+    three_bounds = between("price", 1, 2)
+    three_bounds.condition.values.add(number_value=3)
+    errors = [
+        ("BETWEEN with 3 values", three_bounds),
+        ("Invalid MATCHES pattern", matches("email", "([a-z")),
+    ]
+    for description, node in errors:
+        try:
+            compile_filter(node)
+            print(f"✗ {description}: no error")
+            failures += 1
+        except ValueError as e:
+            print(f"✓ {description}: {e}")
+
+    if failures:
+        raise SystemExit(f"{failures} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
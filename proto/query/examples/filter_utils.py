@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Filter Utilities - Rewrites over Filter trees
+
+Client-side transformations that produce an equivalent but cheaper
+filter before the query is sent:
+- NOT push-down (De Morgan's laws)
+- OR-of-equalities folding into a single IN condition
+- GTE/LTE range pairs fused into a single BETWEEN condition
+- Flattening of nested AND/OR nodes
+- Static simplification: constant folding, contradiction detection and
+  tightening of numeric range bounds
+
+Usage:
+    from filter_utils import flatten, fold_or_eq, fuse_ranges, push_not
+
+    query.filter.CopyFrom(fuse_ranges(flatten(fold_or_eq(push_not(query.filter)))))
+
+    node = simplify(query.filter)
+    if node is CONST_FALSE:
+        ...  # Matches nothing; no need to send the query
+"""
+
+from geniustechspace.query.api.v1 import filter_pb2
+
+
+# Operator pairs where NOT (field op value) == (field inverse value).
+# Operators without an inverse (CONTAINS, MATCHES, ...) keep a NotFilter.
+_INVERSE_OPERATORS = {
+    filter_pb2.OPERATOR_EQ: filter_pb2.OPERATOR_NE,
+    filter_pb2.OPERATOR_NE: filter_pb2.OPERATOR_EQ,
+    filter_pb2.OPERATOR_LT: filter_pb2.OPERATOR_GTE,
+    filter_pb2.OPERATOR_GTE: filter_pb2.OPERATOR_LT,
+    filter_pb2.OPERATOR_LTE: filter_pb2.OPERATOR_GT,
+    filter_pb2.OPERATOR_GT: filter_pb2.OPERATOR_LTE,
+    filter_pb2.OPERATOR_IN: filter_pb2.OPERATOR_NOT_IN,
+    filter_pb2.OPERATOR_NOT_IN: filter_pb2.OPERATOR_IN,
+    filter_pb2.OPERATOR_IS_NULL: filter_pb2.OPERATOR_IS_NOT_NULL,
+    filter_pb2.OPERATOR_IS_NOT_NULL: filter_pb2.OPERATOR_IS_NULL,
+}
+
+
+def push_not(node: filter_pb2.Filter) -> filter_pb2.Filter:
+    """
+    Push NOT down to the leaves of a filter tree
+
+    NOT (A OR B) becomes (NOT A AND NOT B), NOT (A AND B) becomes
+    (NOT A OR NOT B), double negation cancels out and negated leaf
+    conditions flip to their inverse operator where one exists.
+
+    Note: flipping comparisons assumes the field is non-null;
+    NOT (price < 10) and price >= 10 differ for rows where price IS NULL.
+
+    Args:
+        node: Filter tree to rewrite (left unmodified)
+
+    Returns:
+        New, equivalent Filter without NOT above AND/OR nodes
+    """
+    kind = node.WhichOneof("filter_type")
+    if kind == "not_":
+        return _negate(node.not_.condition)
+    if kind in ("and_", "or_"):
+        return _combine(kind, [push_not(child) for child in getattr(node, kind).conditions])
+
+    result = filter_pb2.Filter()
+    result.CopyFrom(node)
+    return result
+
+
+def _negate(node: filter_pb2.Filter) -> filter_pb2.Filter:
+    """Return the pushed-down negation of a filter node"""
+    kind = node.WhichOneof("filter_type")
+    if kind == "not_":
+        return push_not(node.not_.condition)
+    if kind == "and_":
+        return _combine("or_", [_negate(child) for child in node.and_.conditions])
+    if kind == "or_":
+        return _combine("and_", [_negate(child) for child in node.or_.conditions])
+
+    result = filter_pb2.Filter()
+    inverse = _INVERSE_OPERATORS.get(node.condition.operator)
+    if inverse is None:
+        result.not_.condition.CopyFrom(node)
+    else:
+        result.condition.CopyFrom(node.condition)
+        result.condition.operator = inverse
+    return result
+
+
+def fold_or_eq(node: filter_pb2.Filter) -> filter_pb2.Filter:
+    """
+    Fold ORs of equalities on one field into a single IN condition
+
+    (role = 'admin' OR role = 'owner') becomes role IN ('admin', 'owner'):
+    one set-membership probe instead of several comparisons, and a smaller
+    message. Applied recursively; other nodes are copied unchanged.
+
+    Args:
+        node: Filter tree to rewrite (left unmodified)
+
+    Returns:
+        New, equivalent Filter
+    """
+    kind = node.WhichOneof("filter_type")
+    if kind == "not_":
+        result = filter_pb2.Filter()
+        result.not_.condition.CopyFrom(fold_or_eq(node.not_.condition))
+        return result
+    if kind in ("and_", "or_"):
+        children = [fold_or_eq(child) for child in getattr(node, kind).conditions]
+        if kind == "or_":
+            folded = _fold_equalities(children)
+            if folded is not None:
+                return folded
+        return _combine(kind, children)
+
+    result = filter_pb2.Filter()
+    result.CopyFrom(node)
+    return result
+
+
+def _fold_equalities(children: list):
+    """
+    Merge EQ/IN leaves on the same field into one IN, or return None
+
+    A single resulting value is emitted as EQ, as dsl.in_() does.
+    """
+    if not children:
+        return None
+    first = children[0].condition
+    for child in children:
+        if child.WhichOneof("filter_type") != "condition":
+            return None
+        cond = child.condition
+        if (cond.field != first.field
+                or cond.case_sensitive != first.case_sensitive
+                or cond.operator not in (filter_pb2.OPERATOR_EQ, filter_pb2.OPERATOR_IN)):
+            return None
+
+    result = filter_pb2.Filter()
+    folded = result.condition
+    folded.field = first.field
+    folded.operator = filter_pb2.OPERATOR_IN
+    folded.case_sensitive = first.case_sensitive
+    for child in children:
+        cond = child.condition
+        if cond.operator == filter_pb2.OPERATOR_EQ:
+            folded.values.add().CopyFrom(cond.value)
+        else:
+            folded.values.extend(cond.values)
+    if len(folded.values) == 1:
+        folded.operator = filter_pb2.OPERATOR_EQ
+        folded.value.CopyFrom(folded.values[0])
+        del folded.values[:]
+    return result
+
+
+def fuse_ranges(node: filter_pb2.Filter) -> filter_pb2.Filter:
+    """
+    Fuse GTE/LTE pairs on one field of an AND into a single BETWEEN
+
+    (price >= 100 AND price <= 500) becomes price BETWEEN (100, 500): one
+    range probe per field, and one condition on the wire instead of two.
+    Only direct children of an AND are fused, so flatten first to reach
+    pairs split across nested ANDs. Fields with several lower or upper
+    bounds are left alone (simplify() tightens those).
+
+    Args:
+        node: Filter tree to rewrite (left unmodified)
+
+    Returns:
+        New, equivalent Filter
+    """
+    kind = node.WhichOneof("filter_type")
+    if kind == "not_":
+        result = filter_pb2.Filter()
+        result.not_.condition.CopyFrom(fuse_ranges(node.not_.condition))
+        return result
+    if kind in ("and_", "or_"):
+        children = [fuse_ranges(child) for child in getattr(node, kind).conditions]
+        if kind == "and_":
+            children = _fuse_between(children)
+        return _combine(kind, children)
+
+    result = filter_pb2.Filter()
+    result.CopyFrom(node)
+    return result
+
+
+def _fuse_between(children: list) -> list:
+    """Replace each field's single GTE + single LTE leaf with one BETWEEN"""
+    bounds = {}  # field -> [GTE child indexes, LTE child indexes]
+    for index, child in enumerate(children):
+        if child.WhichOneof("filter_type") != "condition":
+            continue
+        cond = child.condition
+        if cond.operator in (filter_pb2.OPERATOR_GTE, filter_pb2.OPERATOR_LTE) and cond.HasField("value"):
+            side = 0 if cond.operator == filter_pb2.OPERATOR_GTE else 1
+            bounds.setdefault(cond.field, ([], []))[side].append(index)
+
+    fused = {}    # index of the first bound -> BETWEEN node
+    dropped = set()
+    for field, (lower, upper) in bounds.items():
+        if len(lower) != 1 or len(upper) != 1:
+            continue
+        low, high = children[lower[0]].condition, children[upper[0]].condition
+        result = filter_pb2.Filter()
+        between = result.condition
+        between.field = field
+        between.operator = filter_pb2.OPERATOR_BETWEEN
+        between.values.add().CopyFrom(low.value)
+        between.values.add().CopyFrom(high.value)
+        first, second = sorted((lower[0], upper[0]))
+        fused[first] = result
+        dropped.add(second)
+
+    return [
+        fused.get(index, child)
+        for index, child in enumerate(children)
+        if index not in dropped
+    ]
+
+
+def flatten(node: filter_pb2.Filter) -> filter_pb2.Filter:
+    """
+    Flatten nested AND/OR nodes into single n-ary nodes
+
+    A AND (B AND C) becomes AND(A, B, C) by associativity, so the service
+    walks one flat list instead of recursing through every level.
+
+    Args:
+        node: Filter tree to rewrite (left unmodified)
+
+    Returns:
+        New, equivalent Filter
+    """
+    kind = node.WhichOneof("filter_type")
+    if kind == "not_":
+        result = filter_pb2.Filter()
+        result.not_.condition.CopyFrom(flatten(node.not_.condition))
+        return result
+    if kind in ("and_", "or_"):
+        children = []
+        for child in getattr(node, kind).conditions:
+            child = flatten(child)
+            if child.WhichOneof("filter_type") == kind:
+                children.extend(getattr(child, kind).conditions)
+            else:
+                children.append(child)
+        return _combine(kind, children)
+
+    result = filter_pb2.Filter()
+    result.CopyFrom(node)
+    return result
+
+
+def _combine(kind: str, children: list) -> filter_pb2.Filter:
+    """Wrap child filters in an AND ("and_") or OR ("or_") node"""
+    result = filter_pb2.Filter()
+    getattr(result, kind).conditions.extend(children)
+    return result
+
+
+class _Constant:
+    """Filter that statically evaluates to a constant"""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __repr__(self) -> str:
+        return self._name
+
+
+# Results of simplify() for filters that match every / no record.
+CONST_TRUE = _Constant("CONST_TRUE")
+CONST_FALSE = _Constant("CONST_FALSE")
+
+_LOWER_BOUNDS = (filter_pb2.OPERATOR_GT, filter_pb2.OPERATOR_GTE)
+_UPPER_BOUNDS = (filter_pb2.OPERATOR_LT, filter_pb2.OPERATOR_LTE)
+
+
+def simplify(node: filter_pb2.Filter):
+    """
+    Statically simplify a filter tree
+
+    - AND containing a false branch is false; OR containing a true branch is true
+    - NOT of a constant is the opposite constant
+    - Nested AND/OR nodes are flattened; single-child nodes are unwrapped
+    - Within an AND, EQ conditions with different values on one field and
+      empty numeric intervals (price < 10 AND price >= 100) are false
+    - Within an AND, numeric bounds on one field are tightened to at most
+      one lower and one upper bound (price > 5 AND price > 10 -> price > 10)
+
+    Args:
+        node: Filter tree to simplify (left unmodified)
+
+    Returns:
+        New, equivalent Filter, or CONST_TRUE / CONST_FALSE
+    """
+    kind = node.WhichOneof("filter_type")
+    if kind == "not_":
+        child = simplify(node.not_.condition)
+        if child is CONST_TRUE:
+            return CONST_FALSE
+        if child is CONST_FALSE:
+            return CONST_TRUE
+        result = filter_pb2.Filter()
+        result.not_.condition.CopyFrom(child)
+        return result
+    if kind in ("and_", "or_"):
+        # Identity and absorbing constants for the node kind
+        identity, absorbing = (CONST_TRUE, CONST_FALSE) if kind == "and_" else (CONST_FALSE, CONST_TRUE)
+        children = []
+        for child in getattr(node, kind).conditions:
+            child = simplify(child)
+            if child is absorbing:
+                return absorbing
+            if child is identity:
+                continue
+            if child.WhichOneof("filter_type") == kind:
+                children.extend(getattr(child, kind).conditions)
+            else:
+                children.append(child)
+        if kind == "and_":
+            children = _tighten_bounds(children)
+            if children is None:
+                return CONST_FALSE
+        if not children:
+            return identity
+        if len(children) == 1:
+            return children[0]
+        return _combine(kind, children)
+
+    result = filter_pb2.Filter()
+    result.CopyFrom(node)
+    return result
+
+
+def _tighten_bounds(children: list):
+    """
+    Merge EQ and numeric range leaves of an AND, per field
+
+    Returns the reduced child list, or None if the conjunction is unsatisfiable.
+    """
+    equalities = {}  # field -> EQ condition
+    bounds = {}      # field -> [lower bound node, upper bound node]
+    for child in children:
+        if child.WhichOneof("filter_type") != "condition":
+            continue
+        cond = child.condition
+        if cond.operator == filter_pb2.OPERATOR_EQ and cond.HasField("value"):
+            seen = equalities.setdefault(cond.field, cond)
+            if _comparable(seen) != _comparable(cond):
+                return None
+        elif (cond.operator in _LOWER_BOUNDS + _UPPER_BOUNDS
+                and cond.value.WhichOneof("kind") == "number_value"):
+            field_bounds = bounds.setdefault(cond.field, [None, None])
+            side = 0 if cond.operator in _LOWER_BOUNDS else 1
+            current = field_bounds[side]
+            if current is None or _tighter(cond, current.condition, lower=side == 0):
+                field_bounds[side] = child
+
+    keep = set()
+    for field, (lower_node, upper_node) in bounds.items():
+        lower = lower_node.condition if lower_node is not None else None
+        upper = upper_node.condition if upper_node is not None else None
+        if lower is not None and upper is not None:
+            low, high = lower.value.number_value, upper.value.number_value
+            if low > high or (low == high and (lower.operator == filter_pb2.OPERATOR_GT
+                                               or upper.operator == filter_pb2.OPERATOR_LT)):
+                return None
+        eq = equalities.get(field)
+        if eq is not None and eq.value.WhichOneof("kind") == "number_value":
+            if not _within(eq.value.number_value, lower, upper):
+                return None
+            # The equality already implies both bounds
+            continue
+        keep.update(id(node) for node in (lower_node, upper_node) if node is not None)
+
+    return [
+        child for child in children
+        if child.WhichOneof("filter_type") != "condition"
+        or child.condition.field not in bounds
+        or child.condition.operator not in _LOWER_BOUNDS + _UPPER_BOUNDS
+        or child.condition.value.WhichOneof("kind") != "number_value"
+        or id(child) in keep
+    ]
+
+
+def _comparable(cond: filter_pb2.Condition):
+    """Key for comparing the operands of two EQ conditions"""
+    kind = cond.value.WhichOneof("kind")
+    if kind == "string_value" and not cond.case_sensitive:
+        return kind, cond.value.string_value.casefold()
+    return kind, cond.value.SerializeToString(deterministic=True)
+
+
+def _tighter(cond, current, lower: bool) -> bool:
+    """True if bound `cond` is stricter than `current`"""
+    new, old = cond.value.number_value, current.value.number_value
+    if new != old:
+        return new > old if lower else new < old
+    # Same value: the strict operator (GT/LT) is tighter
+    return cond.operator in (filter_pb2.OPERATOR_GT, filter_pb2.OPERATOR_LT)
+
+
+def _within(number: float, lower, upper) -> bool:
+    """True if number satisfies both (optional) bound conditions"""
+    if lower is not None:
+        bound = lower.value.number_value
+        if number < bound or (number == bound and lower.operator == filter_pb2.OPERATOR_GT):
+            return False
+    if upper is not None:
+        bound = upper.value.number_value
+        if number > bound or (number == bound and upper.operator == filter_pb2.OPERATOR_LT):
+            return False
+    return True
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Prebuilt Query Generator - Emit static basic queries as byte literals
+
+Runs every static example in basic_queries.py once and writes
+basic_queries_prebuilt.py, a module holding each serialized query as a
+bytes constant plus a function that parses it. Loading a query is then a
+single FromString() call instead of building the message field by field.
+
+Run after generating the Python protobuf code, and again whenever
+basic_queries.py changes:
+    buf generate --path proto/query/
+    python proto/query/examples/gen_prebuilt.py
+"""
+
+import sys
+from pathlib import Path
+
+import basic_queries
+
+
+OUTPUT_FILE = Path(__file__).parent / "basic_queries_prebuilt.py"
+
+HEADER = '''"""
+Prebuilt basic queries
+
+Generated by gen_prebuilt.py from basic_queries.py. DO NOT EDIT.
+"""
+
+from {package} import query_pb2
+'''
+
+EXAMPLE_TEMPLATE = '''
+
+{constant} = {payload!r}
+
+
+def {name}() -> query_pb2.Query:
+    """Fresh copy of basic_queries.{name}()"""
+    return query_pb2.Query.FromString({constant})
+'''
+
+
+def render() -> str:
+    """Render the prebuilt module source"""
+    # Import the generated code from the same package root as basic_queries
+    query_pb2 = basic_queries.query_pb2
+    package = query_pb2.__name__.rpartition(".")[0]
+    parts = [HEADER.format(package=package)]
+    for name in basic_queries._STATIC_EXAMPLES:
+        parts.append(EXAMPLE_TEMPLATE.format(
+            constant=f"_{name.upper()}",
+            payload=basic_queries.get_query_bytes(name),
+            name=name
+        ))
+    return "".join(parts)
+
+
+def main():
+    """Write basic_queries_prebuilt.py"""
+    OUTPUT_FILE.write_text(render())
+    print(f"Wrote {len(basic_queries._STATIC_EXAMPLES)} prebuilt queries to {OUTPUT_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,11 +8,18 @@ Demonstrates:
 - Error handling and retry logic
 - Pagination handling
 - Query explain mode
+
+The client uses grpc.aio: RPCs are coroutines on the caller's event loop,
+so many queries can be in flight at once without a thread per call.
 """
 
+import asyncio
 import grpc
-from typing import Optional, Iterator
-from datetime import datetime
+import logging
+import threading
+import time
+from grpc import aio
+from typing import Optional, AsyncIterator, Union
 from google.protobuf.json_format import MessageToDict
 
 # Import generated protobuf code
@@ -22,10 +29,93 @@ from geniustechspace.query.api.v1 import (
     sort_pb2,
     pagination_pb2
 )
+from geniustechspace.query.plan.v1 import explain_pb2
+
+logger = logging.getLogger(__name__)
 
 # Assuming generated gRPC service
 # from geniustechspace.query.api.v1 import services_pb2_grpc
 
+# Responses at least this large are converted to dicts in a worker thread
+# so the conversion does not stall other requests on the event loop
+_OFFLOAD_BYTES = 1 << 20
+
+# Options for shared channels: allow large result pages and IN lists, and
+# keep idle connections alive (pinging even between calls, e.g. while a
+# caller works through a page) so reuse does not pay for a new handshake
+_CHANNEL_OPTIONS = (
+    ('grpc.max_receive_message_length', 64 << 20),
+    ('grpc.max_send_message_length', 16 << 20),
+    ('grpc.keepalive_time_ms', 30_000),
+    ('grpc.keepalive_timeout_ms', 10_000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0)
+)
+
+# One multiplexed channel per (event loop, host, options), shared by every
+# client: aio channels are bound to the loop they were created on
+_CHANNEL_CACHE: dict[tuple, aio.Channel] = {}
+_CHANNEL_LOCK = threading.Lock()
+
+
+def _shared_channel(host: str) -> aio.Channel:
+    """Cached channel to host for the running event loop"""
+    key = (asyncio.get_running_loop(), host, _CHANNEL_OPTIONS)
+    with _CHANNEL_LOCK:
+        channel = _CHANNEL_CACHE.get(key)
+        if channel is None:
+            # For production, use secure channel:
+            # credentials = grpc.ssl_channel_credentials()
+            # channel = aio.secure_channel(host, credentials, options=_CHANNEL_OPTIONS)
+            
+            # For development:
+            channel = aio.insecure_channel(host, options=_CHANNEL_OPTIONS)
+            _CHANNEL_CACHE[key] = channel
+        return channel
+
+
+async def close_channels():
+    """
+    Close the running loop's shared channels, all at once
+    
+    Call once before the event loop exits. This cannot be left to an
+    atexit hook: closing an aio channel is a coroutine, and by interpreter
+    exit the loop it belongs to has already been closed.
+    """
+    loop = asyncio.get_running_loop()
+    with _CHANNEL_LOCK:
+        keys = [key for key in _CHANNEL_CACHE if key[0] is loop]
+        channels = [_CHANNEL_CACHE.pop(key) for key in keys]
+    await asyncio.gather(*(channel.close() for channel in channels))
+
+
+# User-facing error messages; "{}" takes the error details
+_GRPC_ERROR_MESSAGES = {
+    grpc.StatusCode.INVALID_ARGUMENT: "Invalid query: {}",
+    grpc.StatusCode.NOT_FOUND: "Entity not found: {}",
+    grpc.StatusCode.PERMISSION_DENIED: "Access denied: {}",
+    grpc.StatusCode.UNAUTHENTICATED: "Authentication required",
+    grpc.StatusCode.DEADLINE_EXCEEDED: "Query timeout",
+    grpc.StatusCode.RESOURCE_EXHAUSTED: "Rate limit exceeded",
+    grpc.StatusCode.UNAVAILABLE: "Service unavailable"
+}
+
+
+def _serialize_request(request: Union[query_pb2.Query, bytes]) -> bytes:
+    """Request serializer for Execute: pre-serialized requests go out as is"""
+    if isinstance(request, bytes):
+        return request
+    return request.SerializeToString()
+
+
+def _to_dict(response: query_pb2.QueryResponse) -> dict:
+    """Dictionary form of a response, keyed by proto field names"""
+    return MessageToDict(
+        response,
+        preserving_proto_field_name=True,
+        use_integers_for_enums=True
+    )
+
 
 class QueryClient:
     """Client for Query Service"""
@@ -43,102 +133,145 @@ class QueryClient:
         """
         self.host = host
         self.tenant_id = tenant_id
+        # Per-client metadata, shared by every request
+        self._base_metadata = (('tenant-id', tenant_id),)
         self.timeout = timeout
-        self._channel: Optional[grpc.Channel] = None
+        self._channel: Optional[aio.Channel] = None
         self._stub = None
     
-    def connect(self):
-        """Establish gRPC connection"""
-        # For production, use secure channel:
-        # credentials = grpc.ssl_channel_credentials()
-        # self._channel = grpc.secure_channel(self.host, credentials)
-        
-        # For development:
-        self._channel = grpc.insecure_channel(self.host)
+    async def connect(self):
+        """Establish gRPC connection (reuses the shared channel to host)"""
+        self._channel = _shared_channel(self.host)
         
-        # Create stub (uncomment when service proto is available)
+        # Create stub (uncomment when service proto is available).
+        # Execute is rebound with _serialize_request so that requests
+        # serialized ahead of time (see execute_paginated) are not re-encoded:
         # self._stub = services_pb2_grpc.QueryServiceStub(self._channel)
+        # self._stub.Execute = self._channel.unary_unary(
+        #     "/geniustechspace.query.api.v1.QueryService/Execute",
+        #     request_serializer=_serialize_request,
+        #     response_deserializer=query_pb2.QueryResponse.FromString
+        # )
         
-        print(f"Connected to {self.host}")
+        logger.info("Connected to %s", self.host)
     
-    def close(self):
-        """Close gRPC connection"""
-        if self._channel:
-            self._channel.close()
-            print("Connection closed")
+    async def close(self):
+        """
+        Release gRPC connection
+        
+        The shared channel stays open for other clients; close_channels()
+        closes it at shutdown.
+        """
+        self._channel = None
+        self._stub = None
     
-    def execute_query(self, query: query_pb2.Query, 
-                     timeout: Optional[int] = None) -> dict:
+    async def execute_query(self, query: Union[query_pb2.Query, bytes], 
+                           timeout: Optional[int] = None,
+                           as_dict: bool = False) -> Union[query_pb2.QueryResponse, dict]:
         """
         Execute query and return response
         
         Args:
-            query: Query protobuf message
+            query: Query protobuf message, or its wire bytes (sent as is,
+                e.g. from QueryBuilder.build_bytes())
             timeout: Optional timeout override
+            as_dict: Convert the response to a dictionary (a full walk of
+                the message; read fields directly when possible)
             
         Returns:
-            Response as dictionary
+            QueryResponse message, or a dictionary if as_dict is set
         """
         if not self._stub:
             raise RuntimeError("Not connected. Call connect() first.")
         
         # Add tenant context (in metadata or query)
-        metadata = [
-            ('tenant-id', self.tenant_id),
-            ('request-id', f"req_{datetime.utcnow().timestamp()}")
-        ]
+        metadata = self._base_metadata + (('request-id', f"req_{time.time_ns()}"),)
         
         try:
             # Execute query (uncomment when service is available)
-            # response = self._stub.Execute(
+            # response = await self._stub.Execute(
             #     query,
             #     timeout=timeout or self.timeout,
             #     metadata=metadata
             # )
             
             # For now, return mock response
+            if isinstance(query, bytes):
+                query = query_pb2.Query.FromString(query)
             response = self._mock_response(query)
             
-            return MessageToDict(response)
+            if not as_dict:
+                return response
+            if response.ByteSize() >= _OFFLOAD_BYTES:
+                return await asyncio.to_thread(_to_dict, response)
+            return _to_dict(response)
             
         except grpc.RpcError as e:
             self._handle_grpc_error(e)
             raise
     
-    def execute_paginated(self, query: query_pb2.Query, 
-                         max_pages: int = 10) -> Iterator[dict]:
+    async def execute_paginated(self, query: query_pb2.Query, 
+                               max_pages: int = 10) -> AsyncIterator[query_pb2.QueryResponse]:
         """
         Execute query with automatic pagination
         
+        The next page is requested as soon as the current one arrives, so
+        it is in flight while the caller processes the current page. At
+        most one page is prefetched. The caller's query is not modified.
+        
+        Everything but the pagination is serialized once. Concatenated
+        messages parse as their merge, so each page's request is those
+        bytes followed by a Query holding only that page's pagination.
+        
         Args:
             query: Query protobuf message
             max_pages: Maximum pages to fetch
             
         Yields:
-            Response dictionaries for each page
+            QueryResponse for each page
+            
+        Raises:
+            ValueError: If the query sets an offset (pages follow the cursor)
         """
-        page = 0
-        cursor = None
+        if query.pagination.offset:
+            raise ValueError("execute_paginated() follows cursors; remove the offset")
         
-        while page < max_pages:
-            # Set cursor for subsequent pages
-            if cursor:
-                query.pagination.cursor = cursor
-            
-            response = self.execute_query(query)
-            yield response
-            
-            # Check if more pages
-            pagination = response.get('pagination', {})
-            cursor = pagination.get('nextCursor')
-            
-            if not cursor or not pagination.get('hasMore'):
-                break
-            
-            page += 1
-            print(f"Fetched page {page + 1}")
+        base = query_pb2.Query()
+        base.CopyFrom(query)
+        base.ClearField('pagination')
+        prefix = base.SerializeToString()
+        page_size = query.pagination.page_size
+        
+        def request(cursor: str) -> bytes:
+            page = pagination_pb2.Pagination(page_size=page_size, cursor=cursor)
+            return prefix + query_pb2.Query(pagination=page).SerializeToString()
+        
+        page = 1
+        response = await self.execute_query(request(query.pagination.cursor))
+        next_task = None
+        
+        try:
+            while True:
+                # Check if more pages
+                cursor = response.pagination.next_cursor
+                
+                next_task = None
+                if page < max_pages and cursor and response.pagination.has_more:
+                    next_task = asyncio.create_task(self.execute_query(request(cursor)))
+                
+                yield response
+                
+                if next_task is None:
+                    break
+                response = await next_task
+                page += 1
+                logger.debug("Fetched page %d", page)
+        finally:
+            # Consumer stopped early: drop the page it will never read
+            if next_task is not None and not next_task.done():
+                next_task.cancel()
     
-    def explain_query(self, query: query_pb2.Query) -> dict:
+    async def explain_query(self, query: query_pb2.Query) -> Optional[explain_pb2.ExplainResult]:
         """
         Get query execution plan
         
@@ -146,61 +279,49 @@ class QueryClient:
             query: Query to explain
             
         Returns:
-            Explain result
+            Explain result message, or None if the service returned none
         """
         # Enable explain mode
         if not query.options.explain:
             query.options.explain = True
         
-        response = self.execute_query(query)
+        response = await self.execute_query(query)
         
-        if 'explain' in response:
-            return response['explain']
+        if response.HasField('explain'):
+            return response.explain
         else:
-            print("Warning: Explain result not available")
-            return {}
+            logger.warning("Explain result not available")
+            return None
     
-    def _mock_response(self, query: query_pb2.Query) -> dict:
+    def _mock_response(self, query: query_pb2.Query) -> query_pb2.QueryResponse:
         """Generate mock response for testing"""
         # This would be replaced with actual gRPC call
-        return {
-            'results': [
-                {'id': '1', 'name': 'Item 1'},
-                {'id': '2', 'name': 'Item 2'}
-            ],
-            'pagination': {
-                'totalCount': 100,
-                'pageSize': query.pagination.page_size or 50,
-                'hasMore': True,
-                'nextCursor': 'next_page_cursor_abc123'
-            }
-        }
+        response = query_pb2.QueryResponse(
+            pagination=pagination_pb2.PaginationResponse(
+                total_count=100,
+                page_size=query.pagination.page_size or 50,
+                has_more=True,
+                next_cursor='next_page_cursor_abc123'
+            )
+        )
+        for record in ({'id': '1', 'name': 'Item 1'}, {'id': '2', 'name': 'Item 2'}):
+            response.results.add().update(record)
+        return response
     
     def _handle_grpc_error(self, error: grpc.RpcError):
         """Handle gRPC errors with user-friendly messages"""
         code = error.code()
-        details = error.details()
-        
-        error_messages = {
-            grpc.StatusCode.INVALID_ARGUMENT: f"Invalid query: {details}",
-            grpc.StatusCode.NOT_FOUND: f"Entity not found: {details}",
-            grpc.StatusCode.PERMISSION_DENIED: f"Access denied: {details}",
-            grpc.StatusCode.UNAUTHENTICATED: "Authentication required",
-            grpc.StatusCode.DEADLINE_EXCEEDED: "Query timeout",
-            grpc.StatusCode.RESOURCE_EXHAUSTED: "Rate limit exceeded",
-            grpc.StatusCode.UNAVAILABLE: "Service unavailable"
-        }
-        
-        message = error_messages.get(code, f"Query failed: {details}")
-        print(f"Error [{code.name}]: {message}")
+        template = _GRPC_ERROR_MESSAGES.get(code, "Query failed: {}")
+        message = template.format(error.details())
+        logger.error("Error [%s]: %s", code.name, message)
 
 
-def example_1_simple_query():
+async def example_1_simple_query():
     """Execute simple query with client"""
     client = QueryClient(tenant_id="tenant_demo")
     
     try:
-        client.connect()
+        await client.connect()
         
         # Build query
         query = query_pb2.Query(
@@ -222,48 +343,50 @@ def example_1_simple_query():
         )
         
         # Execute
-        print("Executing query...")
-        response = client.execute_query(query)
+        logger.info("Executing query...")
+        response = await client.execute_query(query)
         
-        print(f"Results: {len(response.get('results', []))} items")
-        print(f"Total: {response['pagination']['totalCount']}")
+        logger.info("Results: %d items", len(response.results))
+        logger.info("Total: %d", response.pagination.total_count)
         
     finally:
-        client.close()
+        await client.close()
 
 
-def example_2_paginated_query():
+async def example_2_paginated_query():
     """Execute query with pagination"""
     client = QueryClient(tenant_id="tenant_demo")
     
     try:
-        client.connect()
+        await client.connect()
         
         query = query_pb2.Query(
             entity="products",
             pagination=pagination_pb2.Pagination(page_size=100)
         )
         
-        print("Fetching all pages...")
+        logger.info("Fetching all pages...")
         total_items = 0
         
-        for page_num, response in enumerate(client.execute_paginated(query, max_pages=5)):
-            items = len(response.get('results', []))
+        page_num = 0
+        async for response in client.execute_paginated(query, max_pages=5):
+            page_num += 1
+            items = len(response.results)
             total_items += items
-            print(f"Page {page_num + 1}: {items} items")
+            logger.info("Page %d: %d items", page_num, items)
         
-        print(f"Total fetched: {total_items} items")
+        logger.info("Total fetched: %d items", total_items)
         
     finally:
-        client.close()
+        await client.close()
 
 
-def example_3_explain_query():
+async def example_3_explain_query():
     """Get query execution plan"""
     client = QueryClient(tenant_id="tenant_demo")
     
     try:
-        client.connect()
+        await client.connect()
         
         query = query_pb2.Query(
             entity="orders",
@@ -289,30 +412,31 @@ def example_3_explain_query():
             )
         )
         
-        print("Getting query plan...")
-        explain = client.explain_query(query)
+        logger.info("Getting query plan...")
+        explain = await client.explain_query(query)
         
-        if explain:
-            print("\nQuery Plan:")
-            print(f"Estimated cost: {explain.get('cost', {}).get('totalCost', 'N/A')}")
-            print(f"Estimated time: {explain.get('cost', {}).get('estimatedTimeMs', 'N/A')}ms")
+        if explain is not None:
+            cost = explain.cost
+            logger.info("\nQuery Plan:")
+            logger.info("Estimated cost: %s", cost.total_cost)
+            logger.info("Estimated time: %dms", cost.estimated_time_ms)
             
-            recommendations = explain.get('recommendations', [])
+            recommendations = explain.recommendations
             if recommendations:
-                print(f"\nRecommendations ({len(recommendations)}):")
+                logger.info("\nRecommendations (%d):", len(recommendations))
                 for rec in recommendations:
-                    print(f"  - [{rec['severity']}] {rec['description']}")
+                    logger.info("  - [%s] %s", explain_pb2.Severity.Name(rec.severity), rec.message)
         
     finally:
-        client.close()
+        await client.close()
 
 
-def example_4_error_handling():
+async def example_4_error_handling():
     """Demonstrate error handling"""
     client = QueryClient(tenant_id="tenant_demo")
     
     try:
-        client.connect()
+        await client.connect()
         
         # Invalid query (missing required field)
         query = query_pb2.Query(
@@ -321,24 +445,24 @@ def example_4_error_handling():
         )
         
         try:
-            response = client.execute_query(query)
+            response = await client.execute_query(query)
         except grpc.RpcError as e:
-            print(f"Caught expected error: {e.code().name}")
+            logger.info("Caught expected error: %s", e.code().name)
         
     finally:
-        client.close()
+        await client.close()
 
 
-def main():
+async def main():
     """Run all client examples"""
-    print("=" * 60)
-    print("gRPC CLIENT EXAMPLES")
-    print("=" * 60)
-    print()
+    logger.info("=" * 60)
+    logger.info("gRPC CLIENT EXAMPLES")
+    logger.info("=" * 60)
+    logger.info("")
     
-    print("Note: These examples use mock responses.")
-    print("Connect to actual query service to see real results.")
-    print()
+    logger.info("Note: These examples use mock responses.")
+    logger.info("Connect to actual query service to see real results.")
+    logger.info("")
     
     examples = [
         ("Simple Query", example_1_simple_query),
@@ -347,16 +471,20 @@ def main():
         ("Error Handling", example_4_error_handling)
     ]
     
-    for name, example_func in examples:
-        print("-" * 60)
-        print(f"Example: {name}")
-        print("-" * 60)
-        try:
-            example_func()
-            print("✓ Completed\n")
-        except Exception as e:
-            print(f"✗ Error: {e}\n")
+    try:
+        for name, example_func in examples:
+            logger.info("-" * 60)
+            logger.info("Example: %s", name)
+            logger.info("-" * 60)
+            try:
+                await example_func()
+                logger.info("✓ Completed\n")
+            except Exception as e:
+                logger.error("✗ Error: %s\n", e)
+    finally:
+        await close_channels()
 
 
 if __name__ == "__main__":
-    main()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Lazy Import - Defer loading generated protobuf modules until first use
+
+Importing a generated *_pb2 module registers its descriptors (and those of
+every .proto it imports), which dominates the import time of the example
+modules. lazy_import() returns a module object whose code only runs on
+the first attribute access, so importing an examples module to call one
+function, or just to list its functions, stays cheap.
+
+Usage:
+    from lazy_import import lazy_import
+
+    query_pb2 = lazy_import("geniustechspace.query.api.v1.query_pb2")
+
+    def build():
+        return query_pb2.Query(entity="users")  # Loaded here
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module lazily
+
+    Args:
+        name: Absolute module name
+
+    Returns:
+        The module, already loaded if it was imported before
+
+    Raises:
+        ModuleNotFoundError: If the module cannot be found
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Protobuf Backend - Check which protobuf implementation is in use
+
+Message construction and serialization run in native code on the upb
+(protobuf >= 4.21) and cpp backends. The pure-Python fallback is one to
+two orders of magnitude slower, so the examples flag it rather than run
+silently slow.
+
+Usage:
+    from protobuf_backend import warn_if_pure_python
+
+    warn_if_pure_python()  # At module import
+"""
+
+import warnings
+
+from google.protobuf.internal import api_implementation
+
+
+def warn_if_pure_python() -> None:
+    """
+    Warn if protobuf is using the pure-Python implementation
+
+    Issues a RuntimeWarning attributed to the caller's module.
+    """
+    if api_implementation.Type() == "python":
+        warnings.warn(
+            "protobuf is using the pure-Python implementation; unset "
+            "PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION or install protobuf>=4.21 "
+            "for the native upb backend",
+            RuntimeWarning,
+            stacklevel=2
+        )
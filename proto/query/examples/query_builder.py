@@ -14,20 +14,53 @@ Usage:
         .build())
 """
 
-from typing import Any, List, Optional, Union
-from datetime import datetime
+import functools
+import warnings
+from typing import Any, List, Union
+from datetime import datetime, timezone
+from enum import Enum
 from google.protobuf.struct_pb2 import Value
 from geniustechspace.query.api.v1 import (
     query_pb2,
     filter_pb2,
     sort_pb2,
     aggregation_pb2,
-    search_pb2,
-    pagination_pb2,
-    relation_pb2
+    search_pb2
 )
 
 
+# Value constructors by exact type, so the common literal types cost one
+# dict lookup instead of a chain of isinstance checks
+_VALUE_BUILDERS = {
+    bool: lambda v: Value(bool_value=v),
+    int: lambda v: Value(number_value=v),
+    float: lambda v: Value(number_value=v),
+    str: lambda v: Value(string_value=v),
+    type(None): lambda v: Value(null_value=0)
+}
+
+# Value field set for each exact type, for filling repeated values in place
+_VALUE_FIELDS = {
+    bool: "bool_value",
+    int: "number_value",
+    float: "number_value",
+    str: "string_value"
+}
+
+# sort_asc()/sort_desc() nulls names; anything else leaves the engine default
+_NULL_ORDERINGS = {
+    "first": sort_pb2.NULL_ORDERING_NULLS_FIRST,
+    "last": sort_pb2.NULL_ORDERING_NULLS_LAST
+}
+
+# consistency() level names
+_CONSISTENCY_LEVELS = {
+    "eventual": query_pb2.CONSISTENCY_LEVEL_EVENTUAL,
+    "strong": query_pb2.CONSISTENCY_LEVEL_STRONG,
+    "linearizable": query_pb2.CONSISTENCY_LEVEL_LINEARIZABLE
+}
+
+
 class QueryBuilder:
     """Fluent query builder for constructing protobuf queries"""
     
@@ -38,15 +71,10 @@ class QueryBuilder:
         Args:
             entity: Entity/collection name to query
         """
-        self._entity = entity
+        # Everything but the filters is written straight into this query;
+        # filters are combined at build time (one condition, or an AND)
+        self._query = query_pb2.Query(entity=entity)
         self._filters: List[filter_pb2.Filter] = []
-        self._sorts: List[sort_pb2.Sort] = []
-        self._projection: Optional[query_pb2.Projection] = None
-        self._pagination: Optional[pagination_pb2.Pagination] = None
-        self._aggregation: Optional[aggregation_pb2.Aggregation] = None
-        self._search: Optional[search_pb2.Search] = None
-        self._relations: List[relation_pb2.Relation] = []
-        self._options: Optional[query_pb2.QueryOptions] = None
     
     # Filter methods
     
@@ -82,26 +110,12 @@ class QueryBuilder:
     
     def filter_in(self, field: str, values: List[Any]) -> 'QueryBuilder':
         """Add IN filter: field IN (values)"""
-        proto_values = [self._to_proto_value(v) for v in values]
-        self._filters.append(filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field=field,
-                operator=filter_pb2.OPERATOR_IN,
-                values=proto_values
-            )
-        ))
+        self._add_set_condition(field, filter_pb2.OPERATOR_IN, values)
         return self
     
     def filter_not_in(self, field: str, values: List[Any]) -> 'QueryBuilder':
         """Add NOT IN filter: field NOT IN (values)"""
-        proto_values = [self._to_proto_value(v) for v in values]
-        self._filters.append(filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field=field,
-                operator=filter_pb2.OPERATOR_NOT_IN,
-                values=proto_values
-            )
-        ))
+        self._add_set_condition(field, filter_pb2.OPERATOR_NOT_IN, values)
         return self
     
     def filter_contains(self, field: str, value: str, case_sensitive: bool = True) -> 'QueryBuilder':
@@ -160,47 +174,61 @@ class QueryBuilder:
     
     def sort_asc(self, field: str, nulls: str = "default") -> 'QueryBuilder':
         """Add ascending sort"""
-        self._add_sort(field, sort_pb2.SORT_DIRECTION_ASC, nulls)
+        self._query.sort.add(
+            field=field,
+            direction=sort_pb2.SORT_DIRECTION_ASC,
+            nulls=_NULL_ORDERINGS.get(nulls, sort_pb2.NULL_ORDERING_UNSPECIFIED)
+        )
         return self
     
     def sort_desc(self, field: str, nulls: str = "default") -> 'QueryBuilder':
         """Add descending sort"""
-        self._add_sort(field, sort_pb2.SORT_DIRECTION_DESC, nulls)
+        self._query.sort.add(
+            field=field,
+            direction=sort_pb2.SORT_DIRECTION_DESC,
+            nulls=_NULL_ORDERINGS.get(nulls, sort_pb2.NULL_ORDERING_UNSPECIFIED)
+        )
         return self
     
     # Projection methods
     
     def include(self, *fields: str) -> 'QueryBuilder':
         """Include only specified fields in result"""
-        self._projection = query_pb2.Projection(include=list(fields))
+        self._query.ClearField("projection")
+        self._query.projection.include.extend(fields)
         return self
     
     def exclude(self, *fields: str) -> 'QueryBuilder':
         """Exclude specified fields from result"""
-        self._projection = query_pb2.Projection(exclude=list(fields))
+        self._query.ClearField("projection")
+        self._query.projection.exclude.extend(fields)
         return self
     
     # Pagination methods
     
     def limit(self, page_size: int) -> 'QueryBuilder':
         """Set page size"""
-        if not self._pagination:
-            self._pagination = pagination_pb2.Pagination()
-        self._pagination.page_size = page_size
+        self._query.pagination.page_size = page_size
         return self
     
     def cursor(self, cursor: str) -> 'QueryBuilder':
         """Set pagination cursor"""
-        if not self._pagination:
-            self._pagination = pagination_pb2.Pagination()
-        self._pagination.cursor = cursor
+        self._query.pagination.cursor = cursor
         return self
     
     def offset(self, offset: int) -> 'QueryBuilder':
-        """Set pagination offset (not recommended, use cursor instead)"""
-        if not self._pagination:
-            self._pagination = pagination_pb2.Pagination()
-        self._pagination.offset = offset
+        """
+        Set pagination offset
+        
+        Deprecated: the service still reads and discards the skipped rows,
+        so each page costs O(offset). Use cursor() instead.
+        """
+        warnings.warn(
+            "offset pagination is O(offset); use cursor()",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        self._query.pagination.offset = offset
         return self
     
     # Search methods
@@ -208,34 +236,32 @@ class QueryBuilder:
     def search_fulltext(self, query: str, fields: List[str] = None, 
                        min_score: float = 0.0) -> 'QueryBuilder':
         """Add full-text search"""
-        self._search = search_pb2.Search(
-            query=query,
-            type=search_pb2.SEARCH_TYPE_FULL_TEXT,
-            fields=fields or [],
-            min_score=min_score
-        )
+        self._query.ClearField("search")
+        search = self._query.search
+        search.query = query
+        search.type = search_pb2.SEARCH_TYPE_FULL_TEXT
+        search.fields.extend(fields or [])
+        search.min_score = min_score
         return self
     
     def search_semantic(self, query: str = None, embedding: List[float] = None,
                        vector_field: str = "embedding", 
                        min_score: float = 0.0) -> 'QueryBuilder':
         """Add semantic vector search"""
-        self._search = search_pb2.Search(
-            query=query or "",
-            type=search_pb2.SEARCH_TYPE_SEMANTIC,
-            vector_field=vector_field,
-            embedding=embedding or [],
-            min_score=min_score
-        )
+        self._query.ClearField("search")
+        search = self._query.search
+        search.query = query or ""
+        search.type = search_pb2.SEARCH_TYPE_SEMANTIC
+        search.vector_field = vector_field
+        search.embedding.extend(embedding or [])
+        search.min_score = min_score
         return self
     
     # Aggregation methods
     
     def group_by(self, *fields: str) -> 'QueryBuilder':
         """Set grouping fields"""
-        if not self._aggregation:
-            self._aggregation = aggregation_pb2.Aggregation()
-        self._aggregation.group_by.extend(fields)
+        self._query.aggregation.group_by.extend(fields)
         return self
     
     def count(self, alias: str = "count") -> 'QueryBuilder':
@@ -281,114 +307,75 @@ class QueryBuilder:
     
     def timeout(self, timeout_ms: int) -> 'QueryBuilder':
         """Set query timeout in milliseconds"""
-        if not self._options:
-            self._options = query_pb2.QueryOptions()
-        self._options.timeout_ms = timeout_ms
+        self._query.options.timeout_ms = timeout_ms
         return self
     
     def explain(self, enabled: bool = True) -> 'QueryBuilder':
         """Enable query plan explanation"""
-        if not self._options:
-            self._options = query_pb2.QueryOptions()
-        self._options.explain = enabled
+        self._query.options.explain = enabled
         return self
     
     def count_total(self, enabled: bool = True) -> 'QueryBuilder':
         """Enable total count (expensive!)"""
-        if not self._options:
-            self._options = query_pb2.QueryOptions()
-        self._options.count_total = enabled
+        self._query.options.count_total = enabled
         return self
     
     def consistency(self, level: str = "strong") -> 'QueryBuilder':
         """Set consistency level: eventual, strong, or linearizable"""
-        if not self._options:
-            self._options = query_pb2.QueryOptions()
-        
-        level_map = {
-            "eventual": query_pb2.CONSISTENCY_LEVEL_EVENTUAL,
-            "strong": query_pb2.CONSISTENCY_LEVEL_STRONG,
-            "linearizable": query_pb2.CONSISTENCY_LEVEL_LINEARIZABLE
-        }
-        self._options.consistency = level_map.get(level, query_pb2.CONSISTENCY_LEVEL_STRONG)
+        self._query.options.consistency = _CONSISTENCY_LEVELS.get(level, query_pb2.CONSISTENCY_LEVEL_STRONG)
         return self
     
     # Build method
     
     def build(self) -> query_pb2.Query:
         """Build final Query protobuf message"""
-        query = query_pb2.Query(entity=self._entity)
+        # One copy, so later builder calls do not change the returned query
+        query = query_pb2.Query()
+        query.CopyFrom(self._query)
         
         # Combine filters with AND
         if self._filters:
             if len(self._filters) == 1:
                 query.filter.CopyFrom(self._filters[0])
             else:
-                query.filter.CopyFrom(filter_pb2.Filter(
-                    and_=filter_pb2.AndFilter(conditions=self._filters)
-                ))
-        
-        # Add sorts
-        if self._sorts:
-            query.sort.extend(self._sorts)
-        
-        # Add projection
-        if self._projection:
-            query.projection.CopyFrom(self._projection)
-        
-        # Add pagination
-        if self._pagination:
-            query.pagination.CopyFrom(self._pagination)
-        elif not self._aggregation:  # Default pagination if not aggregating
-            query.pagination.CopyFrom(pagination_pb2.Pagination(page_size=50))
+                # Appended straight into the query, not via a temporary AndFilter
+                query.filter.and_.conditions.extend(self._filters)
         
-        # Add aggregation
-        if self._aggregation:
-            query.aggregation.CopyFrom(self._aggregation)
-        
-        # Add search
-        if self._search:
-            query.search.CopyFrom(self._search)
-        
-        # Add relations
-        if self._relations:
-            query.relation.extend(self._relations)
-        
-        # Add options
-        if self._options:
-            query.options.CopyFrom(self._options)
+        # Default pagination if not aggregating
+        if not query.HasField("pagination") and not query.HasField("aggregation"):
+            query.pagination.page_size = 50
         
         return query
     
+    def build_bytes(self) -> bytes:
+        """
+        Build the query and serialize it once
+        
+        For queries sent repeatedly (health checks, schema probes), keep
+        the bytes and pass them to QueryClient.execute_query(), which sends
+        them without re-encoding. Serialization is deterministic, so equal
+        builders give equal bytes.
+        """
+        return self.build().SerializeToString(deterministic=True)
+    
     # Helper methods
     
     def _add_condition(self, field: str, operator: int, value: Any):
-        """Add a condition filter"""
-        self._filters.append(filter_pb2.Filter(
-            condition=filter_pb2.Condition(
-                field=field,
-                operator=operator,
-                value=self._to_proto_value(value)
-            )
-        ))
-    
-    def _add_sort(self, field: str, direction: int, nulls: str):
-        """Add a sort specification"""
-        sort = sort_pb2.Sort(field=field, direction=direction)
-        
-        if nulls == "first":
-            sort.nulls = sort_pb2.NULL_ORDERING_NULLS_FIRST
-        elif nulls == "last":
-            sort.nulls = sort_pb2.NULL_ORDERING_NULLS_LAST
-        
-        self._sorts.append(sort)
+        """Add a condition filter, set field by field in place"""
+        node = filter_pb2.Filter()
+        cond = node.condition
+        cond.field = field
+        cond.operator = operator
+        kind = _VALUE_FIELDS.get(type(value))
+        if kind is not None:
+            setattr(cond.value, kind, value)
+        else:
+            _fill_value(cond.value, value)
+        self._filters.append(node)
     
     def _add_aggregate(self, function: int, field: str = None, alias: str = None):
         """Add an aggregate function"""
-        if not self._aggregation:
-            self._aggregation = aggregation_pb2.Aggregation()
-        
-        agg = aggregation_pb2.Aggregate(
+        agg = self._query.aggregation.aggregates.add(
             function=function,
             alias=alias or "result"
         )
@@ -396,12 +383,36 @@ class QueryBuilder:
         if field:
             agg.field = field
         
-        self._aggregation.aggregates.append(agg)
         return self
     
+    def _add_set_condition(self, field: str, operator: int, values: List[Any]):
+        """
+        Add a condition over a list of values
+        
+        Values are written straight into the condition's repeated field,
+        without building (and then copying) a Value message per element,
+        which matters for IN lists of thousands of IDs.
+        """
+        node = filter_pb2.Filter()
+        cond = node.condition
+        cond.field = field
+        cond.operator = operator
+        add = cond.values.add
+        for value in values:
+            kind = _VALUE_FIELDS.get(type(value))
+            if kind is not None:
+                add(**{kind: value})
+            else:
+                _fill_value(add(), value)
+        self._filters.append(node)
+    
     @staticmethod
     def _to_proto_value(value: Any) -> Value:
         """Convert Python value to protobuf Value"""
+        builder = _VALUE_BUILDERS.get(type(value))
+        if builder is not None:
+            return builder(value)
+        # Subclasses (e.g. IntEnum, str enums) and other types
         if isinstance(value, bool):
             return Value(bool_value=value)
         elif isinstance(value, int):
@@ -411,13 +422,45 @@ class QueryBuilder:
         elif isinstance(value, str):
             return Value(string_value=value)
         elif isinstance(value, datetime):
-            return Value(string_value=value.isoformat() + "Z")
+            return Value(string_value=_iso_utc(value))
         elif value is None:
             return Value(null_value=0)
         else:
             return Value(string_value=str(value))
 
 
+def _iso_utc(value: datetime) -> str:
+    """UTC ISO-8601 string with a Z suffix; naive datetimes are taken as UTC"""
+    if value.tzinfo is not None:
+        # isoformat() of an aware datetime already ends in "+HH:MM"
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat() + "Z"
+
+
+@functools.lru_cache(maxsize=1024, typed=True)
+def _value_bytes(value: Any) -> bytes:
+    """
+    Serialized Value for None, an enum member or a datetime, memoized
+    
+    Only for types whose equal values convert identically: the cache is
+    keyed on equality, and e.g. Decimal("1.0") == Decimal("1.00").
+    """
+    return QueryBuilder._to_proto_value(value).SerializeToString()
+
+
+def _fill_value(target: Value, value: Any):
+    """
+    Set an empty Value from a Python value outside _VALUE_FIELDS
+    
+    None, enums and datetimes are converted once and merged from their
+    cached bytes afterwards; anything else is converted on each call.
+    """
+    if value is None or isinstance(value, (Enum, datetime)):
+        target.MergeFromString(_value_bytes(value))
+    else:
+        target.CopyFrom(QueryBuilder._to_proto_value(value))
+
+
 # Example usage
 if __name__ == "__main__":
     # Example 1: Simple filter query
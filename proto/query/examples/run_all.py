@@ -4,106 +4,321 @@ Run All Examples - Execute all query examples
 
 Runs all example scripts and reports results.
 Useful for testing that all examples construct valid queries.
+
+Examples run in parallel in a process pool, each executed as __main__
+(as when run directly) with its output captured. Results are reported
+as examples finish, so wall time is that of the slowest example. Pass
+--fail-fast to stop scheduling examples after the first failure.
+
+With --cache, examples that passed are recorded in .run_all.cache.json
+and skipped on later --cache runs until an example, a helper module, a
+.proto file, the generated code or the protobuf version changes. Skipped
+examples are counted separately in the summary. Without it, every
+example runs.
+
+Usage:
+    python run_all.py [--fail-fast] [--cache]
 """
 
-import sys
+import compileall
+import contextlib
+import hashlib
+import importlib
 import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import CancelledError, ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterator, Optional
+
+
+# Imported once in the parent so forked workers inherit them: loading the
+# protobuf runtime and registering the query descriptors dominates each
+# example's import time
+_PRELOAD = (
+    "google.protobuf.struct_pb2",
+    "geniustechspace.query.api.v1.query_pb2"
+)
+
+# Generated code the examples import, covered by the --cache digest
+_GENERATED_PACKAGE = "geniustechspace.query.api.v1"
+
+# Output separators
+_SEP_EQ = "=" * 70
+_SEP_DASH = "-" * 70
 
 
-def run_example_module(module_path: Path) -> tuple[bool, str]:
+def _nproc() -> int:
     """
-    Run an example module and return success status
+    CPUs this process may run on
+    
+    os.cpu_count() reports every CPU on the host, even when the process
+    is pinned to fewer (taskset, container cpusets); the affinity mask
+    does not.
+    """
+    sched_getaffinity = getattr(os, "sched_getaffinity", None)  # Linux only
+    if sched_getaffinity is not None:
+        return len(sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@contextlib.contextmanager
+def _isolated_sys_modules(directory: Path):
+    """
+    Forget modules from directory that were first imported in the block
+    
+    Helpers such as dsl and query_builder keep module-level caches, so an
+    example must not inherit them from one that ran earlier in the same
+    worker. Modules from elsewhere (the protobuf runtime, generated code)
+    stay loaded: they hold no example state, and reloading generated
+    code would register its descriptors again.
+    """
+    before = set(sys.modules)
+    try:
+        yield
+    finally:
+        local = {name[:-3] for name in os.listdir(directory) if name.endswith(".py")}
+        for name in (set(sys.modules) - before) & local:
+            del sys.modules[name]
+
+
+def _run(path: str) -> tuple[str, bool, str, str, int]:
+    """
+    Run one example in a pool worker
+    
+    runpy executes the module as __main__, swapping it into sys.modules
+    only while it runs, and helper modules it imports from the examples
+    directory are dropped afterwards, so examples sharing a worker do not
+    see each other.
+    run_module rather than run_path: it loads through the import system
+    and so uses the bytecode compiled in main(); run_path always
+    compiles from source. The examples directory is first on sys.path.
     
     Args:
-        module_path: Path to Python module
+        path: Path to the example file
         
     Returns:
-        Tuple of (success, error_message)
+        Tuple of (filename, success, error_message, captured_stdout,
+        duration_ns)
+    """
+    module_path = Path(path)
+    output = io.StringIO()
+    success, error = True, ""
+    start = time.perf_counter_ns()
+    try:
+        with contextlib.redirect_stdout(output), _isolated_sys_modules(module_path.parent):
+            runpy.run_module(module_path.stem, run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        if e.code:
+            success, error = False, f"exit status {e.code}"
+    except Exception as e:
+        output.write(traceback.format_exc())
+        success, error = False, str(e)
+    duration_ns = time.perf_counter_ns() - start
+    return module_path.name, success, error, output.getvalue(), duration_ns
+
+
+def _sources_digest(examples_dir: Path) -> bytes:
+    """
+    Digest of everything an example's result depends on
+    
+    Covers every example and helper module, the .proto sources, the
+    generated query modules and the protobuf version, so a passing result
+    is reused only while none of them change. Each example is keyed by
+    this digest combined with its own name.
     """
+    digest = hashlib.sha256()
+    sources = [*examples_dir.glob("*.py"), *examples_dir.parent.rglob("*.proto")]
+    try:
+        generated = importlib.util.find_spec(_GENERATED_PACKAGE)
+    except ImportError:
+        generated = None
+    if generated is not None:
+        for location in generated.submodule_search_locations or ():
+            sources.extend(Path(location).glob("*.py"))
+    else:
+        digest.update(b"no generated code")
+    for path in sorted(sources):
+        digest.update(path.read_bytes())
     try:
-        # Load module dynamically
-        spec = importlib.util.spec_from_file_location(module_path.stem, module_path)
-        if spec is None or spec.loader is None:
-            return False, "Could not load module"
+        from google.protobuf import __version__ as protobuf_version
+    except ImportError:
+        protobuf_version = "not installed"
+    digest.update(protobuf_version.encode())
+    return digest.digest()
+
+
+def _iter_results(examples_dir: Path, example_files: list[str],
+                  fail_fast: bool = False,
+                  cache_path: Optional[Path] = None) -> Iterator[tuple[str, bool, str, Optional[int]]]:
+    """
+    Run the examples in parallel, reporting each as it finishes
+    
+    Args:
+        examples_dir: Directory holding the examples
+        example_files: Example file names to run
+        fail_fast: Drop examples not yet started after the first failure
+        cache_path: Record of passing examples to skip, updated with the
+            results of this run (None runs every example)
         
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_path.stem] = module
-        spec.loader.exec_module(module)
+    Yields:
+        Tuple of (filename, success, error_message, duration_ns), in
+        completion order; duration_ns is None for examples that did not run
+    """
+    paths = []
+    
+    # One directory listing instead of a stat() per example
+    with os.scandir(examples_dir) as entries:
+        present = {entry.name for entry in entries if entry.is_file()}
+    
+    cache = {}
+    digests = {}
+    sources = None
+    if cache_path is not None:
+        try:
+            cache = json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            pass
+        sources = _sources_digest(examples_dir)
+    
+    # Single pass: existence check, digest and cache lookup per example
+    for example_file in example_files:
+        if example_file not in present:
+            sys.stdout.write(f"⚠️  Skipping {example_file} (not found)\n")
+            yield example_file, False, "File not found", None
+            continue
         
-        # Run main function if exists
-        if hasattr(module, 'main'):
-            module.main()
-            return True, ""
-        else:
-            return False, "No main() function found"
+        if sources is not None:
+            digests[example_file] = hashlib.sha256(sources + example_file.encode()).hexdigest()
+            if cache.get(example_file) == digests[example_file]:
+                sys.stdout.write(f"↻ {example_file} (cached)\n")
+                yield example_file, True, "", None
+                continue
+        
+        paths.append(str(examples_dir / example_file))
+    
+    if paths:
+        yield from _run_parallel(paths, examples_dir, fail_fast, cache, digests)
+    
+    if cache_path is not None:
+        try:
+            cache_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+        except OSError:
+            pass
+
+
+def _run_parallel(paths: list[str], examples_dir: Path, fail_fast: bool,
+                  cache: dict, digests: dict) -> Iterator[tuple[str, bool, str, Optional[int]]]:
+    """Run examples in the process pool, recording passes in cache"""
+    # Compile the examples and their shared helpers once, here, rather
+    # than in every worker that imports them. Each .pyc records its
+    # source's mtime and size, so on reruns this is a stat per file and
+    # workers load the cached code until an example changes.
+    if not sys.dont_write_bytecode:
+        compileall.compile_dir(str(examples_dir), maxlevels=0, quiet=1)
+    
+    # Fork where available so workers start with the preloaded modules.
+    # Missing generated code is left for the examples to report.
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        for name in _PRELOAD:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+    else:
+        context = None
+    
+    max_workers = min(len(paths), _nproc())
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {executor.submit(_run, path): Path(path).name for path in paths}
+        
+        for future in as_completed(futures):
+            try:
+                example_file, success, error, output, duration_ns = future.result()
+            except CancelledError:
+                yield futures[future], False, "Not run (--fail-fast)", None
+                continue
             
-    except Exception as e:
-        return False, str(e)
+            # One write per example: header, captured output and status
+            if success:
+                status = f"✓ {example_file} completed successfully"
+            else:
+                status = f"✗ {example_file} failed: {error}"
+            sys.stdout.write(f"Running {example_file}...\n{_SEP_DASH}\n{output}{status}\n\n")
+            
+            if success and example_file in digests:
+                cache[example_file] = digests[example_file]
+            else:
+                cache.pop(example_file, None)
+            
+            if not success and fail_fast:
+                # Examples already running finish; queued ones are dropped
+                for pending in futures:
+                    pending.cancel()
+            
+            yield example_file, success, error, duration_ns
 
 
 def main():
     """Run all example files"""
+    fail_fast = "--fail-fast" in sys.argv[1:]
     examples_dir = Path(__file__).parent
+    cache_path = examples_dir / ".run_all.cache.json" if "--cache" in sys.argv[1:] else None
     
     # List of example files to run
     example_files = [
         "basic_queries.py",
         "advanced_queries.py",
         "ecommerce_examples.py",
-        "query_builder.py"
+        "query_builder.py",
+        "filter_eval.py"
     ]
     
-    print("=" * 70)
-    print("RUNNING ALL QUERY EXAMPLES")
-    print("=" * 70)
-    print()
-    
-    results = []
+    sys.stdout.write(f"{_SEP_EQ}\nRUNNING ALL QUERY EXAMPLES\n{_SEP_EQ}\n\n")
     
-    for example_file in example_files:
-        example_path = examples_dir / example_file
-        
-        if not example_path.exists():
-            print(f"⚠️  Skipping {example_file} (not found)")
-            results.append((example_file, False, "File not found"))
-            continue
-        
-        print(f"Running {example_file}...")
-        print("-" * 70)
-        
-        success, error = run_example_module(example_path)
-        results.append((example_file, success, error))
-        
+    # Single pass: count passes, keep only the failures, collect timings
+    passed = 0
+    cached = 0
+    failed = []
+    timings = []
+    for filename, success, error, duration_ns in _iter_results(examples_dir, example_files, fail_fast, cache_path):
         if success:
-            print(f"✓ {example_file} completed successfully")
+            passed += 1
         else:
-            print(f"✗ {example_file} failed: {error}")
-        
-        print()
+            failed.append(f"  - {filename}: {error}\n")
+        if duration_ns is not None:
+            timings.append((duration_ns, filename))
+        elif success:
+            cached += 1
+    total = passed + len(failed)
     
     # Summary
-    print("=" * 70)
-    print("SUMMARY")
-    print("=" * 70)
-    print()
-    
-    passed = sum(1 for _, success, _ in results if success)
-    total = len(results)
-    
-    print(f"Passed: {passed}/{total}")
-    print()
-    
-    if passed < total:
-        print("Failed examples:")
-        for filename, success, error in results:
-            if not success:
-                print(f"  - {filename}: {error}")
-        print()
-        sys.exit(1)
+    note = f" ({cached} cached, not run)" if cached else ""
+    summary = f"{_SEP_EQ}\nSUMMARY\n{_SEP_EQ}\n\nPassed: {passed}/{total}{note}\n\n"
+    
+    if failed:
+        summary += f"Failed examples:\n{''.join(failed)}\n"
     else:
-        print("All examples passed! ✓")
-        sys.exit(0)
+        summary += "All examples passed! ✓\n"
+    
+    # Slowest first: where to look when the run gets slow
+    if timings:
+        rows = "".join(
+            f"  {filename:<30} {duration_ns / 1e6:>8.2f} ms\n"
+            for duration_ns, filename in sorted(timings, reverse=True)
+        )
+        gap = "" if failed else "\n"  # The failure list ends with a blank line
+        summary += f"{gap}Timings:\n{rows}"
+    
+    sys.stdout.write(summary)
+    sys.exit(1 if failed else 0)
 
 
 if __name__ == "__main__":